@@ -6,7 +6,7 @@ from sqlalchemy import pool
 from alembic import context
 
 from app.database import Base
-from app.models import Account, Bill, Payment, PaymentMethod, Task
+from app.models import Account, Bill, DriverSession, Payment, PaymentMethod, SpendingRollup, Task
 
 config = context.config
 
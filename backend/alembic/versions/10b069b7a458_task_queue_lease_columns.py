@@ -0,0 +1,65 @@
+"""task queue lease columns
+
+Revision ID: 10b069b7a458
+Revises: a75ea7c7a03e
+Create Date: 2026-10-17 19:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '10b069b7a458'
+down_revision: Union[str, Sequence[str], None] = 'a75ea7c7a03e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Adds the columns workers need to claim tasks from the table: priority,
+    the task inputs that used to be thread arguments, and the lease.
+    """
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('priority', sa.Integer(), server_default='1', nullable=False))
+        batch_op.add_column(sa.Column('driver_name', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('payment_method_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('worker_id', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.create_foreign_key('fk_tasks_payment_method_id', 'payment_methods', ['payment_method_id'], ['id'])
+        batch_op.create_index('ix_tasks_status_priority_created_at', ['status', 'priority', 'created_at'], unique=False)
+
+    # Backfill driver_name so per-driver limits apply to tasks queued before this revision
+    op.execute(
+        "UPDATE tasks SET driver_name = "
+        "(SELECT accounts.driver_name FROM accounts WHERE accounts.id = tasks.account_id)"
+    )
+    # Tasks left pending or running by the thread-per-task version can't be
+    # resumed: their inputs (e.g. the payment method of a `pay`) only lived in
+    # the thread. Fail them instead of letting a worker claim them.
+    op.execute(
+        "UPDATE tasks SET status = 'failed', "
+        "error = 'La tarea fue interrumpida por una actualización; volvé a iniciarla', "
+        "finished_at = CURRENT_TIMESTAMP "
+        "WHERE status IN ('pending', 'running')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_status_priority_created_at')
+        batch_op.drop_constraint('fk_tasks_payment_method_id', type_='foreignkey')
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('worker_id')
+        batch_op.drop_column('payment_method_id')
+        batch_op.drop_column('driver_name')
+        batch_op.drop_column('priority')
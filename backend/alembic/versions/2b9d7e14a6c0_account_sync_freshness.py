@@ -0,0 +1,30 @@
+"""account sync freshness override
+
+Revision ID: 2b9d7e14a6c0
+Revises: 8e4a61c3f2d7
+Create Date: 2026-10-17 20:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b9d7e14a6c0'
+down_revision: Union[str, Sequence[str], None] = '8e4a61c3f2d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('accounts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_freshness_seconds', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('accounts', schema=None) as batch_op:
+        batch_op.drop_column('sync_freshness_seconds')
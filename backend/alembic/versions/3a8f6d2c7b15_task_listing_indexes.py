@@ -0,0 +1,34 @@
+"""indexes for task listing and stats
+
+Revision ID: 3a8f6d2c7b15
+Revises: e5a2c8f4d163
+Create Date: 2026-10-17 23:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a8f6d2c7b15'
+down_revision: Union[str, Sequence[str], None] = 'e5a2c8f4d163'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_tasks_type_status_created_at_id', ['type', 'status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_tasks_driver_name_created_at_id', ['driver_name', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_driver_name_created_at_id')
+        batch_op.drop_index('ix_tasks_type_status_created_at_id')
+        batch_op.drop_index('ix_tasks_created_at_id')
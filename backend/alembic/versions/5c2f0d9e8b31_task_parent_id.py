@@ -0,0 +1,40 @@
+"""task parent_id for bulk operations
+
+Revision ID: 5c2f0d9e8b31
+Revises: 10b069b7a458
+Create Date: 2026-10-17 19:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2f0d9e8b31'
+down_revision: Union[str, Sequence[str], None] = '10b069b7a458'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Parent tasks (e.g. sync_all) group child tasks and have no account.
+    """
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('parent_id', sa.String(), nullable=True))
+        batch_op.alter_column('account_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.create_foreign_key('fk_tasks_parent_id', 'tasks', ['parent_id'], ['id'])
+        batch_op.create_index(batch_op.f('ix_tasks_parent_id'), ['parent_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM tasks WHERE account_id IS NULL")
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tasks_parent_id'))
+        batch_op.drop_constraint('fk_tasks_parent_id', type_='foreignkey')
+        batch_op.alter_column('account_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('parent_id')
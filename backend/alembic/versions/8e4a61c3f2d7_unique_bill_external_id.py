@@ -0,0 +1,47 @@
+"""unique bill external_id per account
+
+Revision ID: 8e4a61c3f2d7
+Revises: 5c2f0d9e8b31
+Create Date: 2026-10-17 19:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4a61c3f2d7'
+down_revision: Union[str, Sequence[str], None] = '5c2f0d9e8b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Merges duplicated (account_id, external_id) bills into the oldest row,
+    repointing payments and tasks, before adding the unique index.
+    """
+    keep = (
+        "(SELECT MIN(b2.id) FROM bills b2 "
+        "WHERE b2.account_id = bills.account_id AND b2.external_id = bills.external_id)"
+    )
+    duplicates = f"SELECT id FROM bills WHERE id <> {keep}"
+    for table in ('payments', 'tasks'):
+        op.execute(
+            f"UPDATE {table} SET bill_id = ("
+            f"SELECT {keep} FROM bills WHERE bills.id = {table}.bill_id"
+            f") WHERE bill_id IN ({duplicates})"
+        )
+    op.execute(f"DELETE FROM bills WHERE id IN ({duplicates})")
+
+    with op.batch_alter_table('bills', schema=None) as batch_op:
+        batch_op.create_index('uq_bills_account_id_external_id', ['account_id', 'external_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('bills', schema=None) as batch_op:
+        batch_op.drop_index('uq_bills_account_id_external_id')
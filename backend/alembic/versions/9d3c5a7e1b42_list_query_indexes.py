@@ -0,0 +1,46 @@
+"""composite indexes for list and lookup queries
+
+Revision ID: 9d3c5a7e1b42
+Revises: 4f1b8c2e9a57
+Create Date: 2026-10-17 21:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3c5a7e1b42'
+down_revision: Union[str, Sequence[str], None] = '4f1b8c2e9a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('bills', schema=None) as batch_op:
+        batch_op.create_index('ix_bills_account_id_status_due_date', ['account_id', 'status', 'due_date'], unique=False)
+        batch_op.create_index('ix_bills_status_due_date', ['status', 'due_date'], unique=False)
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('ix_payments_account_id_paid_at', ['account_id', 'paid_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_payments_bill_id'), ['bill_id'], unique=False)
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_account_id_status_created_at', ['account_id', 'status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_account_id_status_created_at')
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_payments_bill_id'))
+        batch_op.drop_index('ix_payments_account_id_paid_at')
+
+    with op.batch_alter_table('bills', schema=None) as batch_op:
+        batch_op.drop_index('ix_bills_status_due_date')
+        batch_op.drop_index('ix_bills_account_id_status_due_date')
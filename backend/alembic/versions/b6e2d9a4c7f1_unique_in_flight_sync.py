@@ -0,0 +1,47 @@
+"""one in-flight sync per account
+
+Revision ID: b6e2d9a4c7f1
+Revises: f3a7c1d9e2b8
+Create Date: 2026-10-18 00:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d9a4c7f1'
+down_revision: Union[str, Sequence[str], None] = 'f3a7c1d9e2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+IN_FLIGHT = "type = 'sync' AND status IN ('pending', 'running')"
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Partial unique index so that the check for an in-flight sync and the
+    insert of a new one can't race. Duplicates queued before it (only the
+    oldest of each account is kept) are failed first.
+    """
+    op.execute(
+        "UPDATE tasks SET status = 'failed', error = 'Sincronización duplicada', "
+        "finished_at = CURRENT_TIMESTAMP "
+        f"WHERE {IN_FLIGHT} AND EXISTS ("
+        "  SELECT 1 FROM tasks AS older"
+        "  WHERE older.account_id = tasks.account_id"
+        "    AND older.type = 'sync' AND older.status IN ('pending', 'running')"
+        "    AND (older.created_at < tasks.created_at"
+        "         OR (older.created_at = tasks.created_at AND older.id < tasks.id)))"
+    )
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('uq_tasks_sync_in_flight', ['account_id'], unique=True, sqlite_where=sa.text(IN_FLIGHT))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('uq_tasks_sync_in_flight')
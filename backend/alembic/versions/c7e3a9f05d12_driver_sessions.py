@@ -0,0 +1,35 @@
+"""driver_sessions cache table
+
+Revision ID: c7e3a9f05d12
+Revises: 2b9d7e14a6c0
+Create Date: 2026-10-17 20:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3a9f05d12'
+down_revision: Union[str, Sequence[str], None] = '2b9d7e14a6c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('driver_sessions',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('encrypted_state', sa.LargeBinary(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ),
+    sa.PrimaryKeyConstraint('account_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('driver_sessions')
@@ -0,0 +1,30 @@
+"""bills paid together by a pay_bills task
+
+Revision ID: d81f4b6a2e93
+Revises: 6c1e9b4d8f20
+Create Date: 2026-10-17 23:55:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f4b6a2e93'
+down_revision: Union[str, Sequence[str], None] = '6c1e9b4d8f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('bill_ids', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_column('bill_ids')
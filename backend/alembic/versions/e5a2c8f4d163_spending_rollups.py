@@ -0,0 +1,68 @@
+"""spending_rollups table
+
+Revision ID: e5a2c8f4d163
+Revises: 9d3c5a7e1b42
+Create Date: 2026-10-17 22:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2c8f4d163'
+down_revision: Union[str, Sequence[str], None] = '9d3c5a7e1b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('spending_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('payment_method_id', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('currency', sa.String(), nullable=False),
+    sa.Column('paid_cents', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('payment_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('due_cents', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('due_count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('spending_rollups', schema=None) as batch_op:
+        batch_op.create_index('ix_spending_rollups_month', ['month'], unique=False)
+        batch_op.create_index('uq_spending_rollups_key', ['account_id', 'payment_method_id', 'month', 'currency'], unique=True)
+
+    # Same computation as services.rollups.rebuild
+    op.execute("""
+        INSERT INTO spending_rollups
+            (account_id, payment_method_id, month, currency, paid_cents, payment_count, due_cents, due_count)
+        SELECT account_id, payment_method_id, month, currency,
+               SUM(paid_cents), SUM(payment_count), SUM(due_cents), SUM(due_count)
+        FROM (
+            SELECT p.account_id, COALESCE(p.payment_method_id, 0) AS payment_method_id,
+                   strftime('%Y-%m', p.paid_at) AS month, COALESCE(b.currency, 'ARS') AS currency,
+                   CAST(ROUND(p.amount * 100) AS INTEGER) AS paid_cents, 1 AS payment_count,
+                   0 AS due_cents, 0 AS due_count
+            FROM payments p LEFT OUTER JOIN bills b ON b.id = p.bill_id
+            WHERE p.status = 'completed' AND p.paid_at IS NOT NULL
+            UNION ALL
+            SELECT account_id, 0, strftime('%Y-%m', due_date), COALESCE(currency, 'ARS'),
+                   0, 0, amount_cents, 1
+            FROM bills
+            WHERE status = 'UNPAID'
+        )
+        GROUP BY account_id, payment_method_id, month, currency
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('spending_rollups', schema=None) as batch_op:
+        batch_op.drop_index('uq_spending_rollups_key')
+        batch_op.drop_index('ix_spending_rollups_month')
+
+    op.drop_table('spending_rollups')
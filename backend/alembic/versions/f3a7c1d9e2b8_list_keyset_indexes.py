@@ -0,0 +1,38 @@
+"""indexes in the keyset order of the bill and payment lists
+
+Revision ID: f3a7c1d9e2b8
+Revises: d81f4b6a2e93
+Create Date: 2026-10-18 00:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7c1d9e2b8'
+down_revision: Union[str, Sequence[str], None] = 'd81f4b6a2e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('bills', schema=None) as batch_op:
+        batch_op.create_index('ix_bills_due_date_id', ['due_date', 'id'], unique=False)
+        batch_op.create_index('ix_bills_account_id_due_date_id', ['account_id', 'due_date', 'id'], unique=False)
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('ix_payments_paid_at_id', ['paid_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index('ix_payments_paid_at_id')
+
+    with op.batch_alter_table('bills', schema=None) as batch_op:
+        batch_op.drop_index('ix_bills_account_id_due_date_id')
+        batch_op.drop_index('ix_bills_due_date_id')
@@ -0,0 +1,61 @@
+"""Maintenance commands.
+
+    uv run python -m app.cli rebuild-rollups
+    uv run python -m app.cli prune-tasks
+    uv run python -m app.cli rotate-keys
+"""
+import argparse
+import sys
+
+from .database import SessionLocal
+from .services import key_rotation, rollups, task_retention
+
+
+def rebuild_rollups(args):
+    with SessionLocal() as db:
+        count = rollups.rebuild(db)
+        db.commit()
+    print(f"Rollups recalculados: {count} filas")
+
+
+def prune_tasks(args):
+    with SessionLocal() as db:
+        counts = task_retention.prune_tasks(db)
+    print(f"Tareas eliminadas: {counts['deleted']}, resultados compactados: {counts['compacted']}")
+
+
+def rotate_keys(args):
+    try:
+        with SessionLocal() as db:
+            counts = key_rotation.rotate_keys(db, args.checkpoint, args.batch_size)
+    except key_rotation.UnreadableToken as exc:
+        sys.exit(
+            f"No se pudo descifrar {exc.table} {exc.row_id} con las claves configuradas: "
+            f"agregá su clave a CARD_ENCRYPTION_OLD_KEYS y volvé a ejecutar (se retoma desde {args.checkpoint})"
+        )
+    print(", ".join(f"{table}: {count} filas recifradas" for table, count in counts.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cuentas App maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-rollups", help="Recompute spending_rollups from payments and bills")
+    rebuild.set_defaults(handler=rebuild_rollups)
+
+    prune = commands.add_parser("prune-tasks", help="Apply the task retention policy (TASK_RETENTION_*)")
+    prune.set_defaults(handler=prune_tasks)
+
+    rotate = commands.add_parser(
+        "rotate-keys", help="Re-encrypt card data and sessions with CARD_ENCRYPTION_KEY (old keys in CARD_ENCRYPTION_OLD_KEYS)"
+    )
+    rotate.add_argument("--batch-size", type=int, default=key_rotation.ROTATION_BATCH_SIZE)
+    rotate.add_argument("--checkpoint", default="rotate-keys.checkpoint.json", help="progress file, to resume an interrupted run")
+    rotate.set_defaults(handler=rotate_keys)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,68 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./cuentas.db"
     card_encryption_key: str = ""
+    card_encryption_old_keys: list[str] = []  # still accepted for decryption until `app.cli rotate-keys` runs
+
+    # SQLite profile, applied to every connection
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"  # NORMAL is safe with WAL
+    sqlite_busy_timeout_ms: int = 5000  # wait for the write lock instead of failing with "database is locked"
+    sqlite_cache_size_kb: int = 20000  # page cache per connection
+    sqlite_mmap_size_mb: int = 256  # 0 disables memory-mapped reads
+    sqlite_foreign_keys: bool = True
+
+    # Connection pool (file databases)
+    db_pool_size: int = 10  # API threadpool + executor threads + heartbeat
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30  # seconds to wait for a free connection
+    async_db_enabled: bool = False  # serve the hot read endpoints with an async engine (pip install .[async])
+    fast_list_responses: bool = True  # list endpoints: Core rows straight to JSON (orjson if installed)
+
+    # In-process cache of accounts and payment methods (services/lookup_cache.py)
+    cache_ttl_seconds: float = 300  # 0 disables
+    cache_max_entries: int = 256  # per cache, least recently used evicted first
+
+    # Longest stdout line (one JSON message) accepted from a driver; longer ones fail the job
+    driver_max_message_mb: int = 16
+
+    # Driver worker pool (drivers that implement the `serve` command)
+    driver_pool_enabled: bool = False
+    driver_pool_size: int = 2  # workers per driver
+    driver_pool_max_jobs: int = 50  # recycle a worker after this many jobs
+    driver_pool_max_rss_mb: int = 1024  # recycle a worker above this memory (browser included)
+    driver_pool_startup_timeout: int = 60  # seconds to wait for the worker handshake
+
+    # Background task queue (tasks table) and executors
+    task_embedded_worker: bool = True  # run an executor inside the API process
+    task_max_concurrency: int = 2  # tasks running at once per process
+    task_max_per_driver: int = 1  # across all processes
+    task_lease_seconds: int = 60  # renewed by a heartbeat every lease/3 seconds
+    task_poll_interval: float = 2.0
+    task_max_attempts: int = 3  # runs of a task whose lease expired (pay is never retried)
+    task_events_keepalive: float = 15.0  # seconds between SSE keepalive comments
+    task_events_fallback_interval: float = 60.0  # re-read a quiet task (standalone workers don't publish here)
+
+    # Task retention (services/task_retention.py); 0 disables each rule
+    task_retention_days: int = 30  # finished tasks older than this are deleted...
+    task_retention_per_account: int = 20  # ...except the latest N of each account
+    task_result_compact_days: int = 7  # older results drop the driver's bill list
+    task_prune_interval: float = 3600  # seconds between runs in each executor
+
+    # Sync freshness: skip the driver if the last successful sync is newer than this
+    sync_freshness_seconds: int = 300  # 0 disables
+    sync_freshness_by_driver: dict[str, int] = {}  # e.g. {"ecogas": 3600}; accounts can override
+
+    # Cached browser sessions (Playwright storage_state), encrypted with CARD_ENCRYPTION_KEY
+    driver_session_ttl: int = 1800  # seconds
+
+    # History backfill (POST /accounts/{id}/backfill)
+    backfill_batch_size: int = 200  # bills written per transaction
+    backfill_timeout: int = 900  # seconds
 
     class Config:
         env_file = ".env"
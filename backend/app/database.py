@@ -1,17 +1,64 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from .config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}  # SQLite specific
-)
+
+def _engine_options(url: str) -> dict:
+    if not url.startswith("sqlite"):
+        return {}
+    options = {"connect_args": {"check_same_thread": False}}  # SQLite specific
+    if ":memory:" not in url and url.rstrip("/") != "sqlite:":
+        # Request handlers, executor threads and the heartbeat share the pool;
+        # with WAL the readers don't block behind the single writer.
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection):
+    """Per-connection SQLite profile (see the `sqlite_*` settings)."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kb)}")  # negative = KiB
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_mb) * 1024 * 1024}")
+        cursor.execute(f"PRAGMA foreign_keys={'ON' if settings.sqlite_foreign_keys else 'OFF'}")
+    finally:
+        cursor.close()
+
+
+engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Opt-in async engine for the hot read endpoints (ASYNC_DB_ENABLED, needs the `async` extra)
+async_engine = None
+AsyncSessionLocal = None
+if settings.async_db_enabled:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = settings.database_url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    async_engine = create_async_engine(async_url, **_engine_options(settings.database_url))
+    if async_engine.dialect.name == "sqlite":
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def _on_async_connect(dbapi_connection, connection_record):
+            apply_sqlite_pragmas(dbapi_connection)
+
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 class Base(DeclarativeBase):
     pass
@@ -23,3 +70,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,12 +1,32 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routers import accounts, bills, payment_methods, payments, tasks
+from .config import get_settings
+from .database import async_engine
+from .routers import accounts, async_reads, bills, dashboard, payment_methods, payments, stats, tasks
+from .services import lookup_cache
+from .services.task_executor import task_executor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    embedded = get_settings().task_embedded_worker
+    if embedded:
+        task_executor.start()
+    yield
+    if embedded:
+        task_executor.stop(timeout=5)
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 app = FastAPI(
     title="Cuentas App API",
     description="API para gestionar cuentas y pagos de servicios",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS for frontend
@@ -16,13 +36,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# Include routers
+# Include routers (the async reads, when enabled, take precedence over their sync versions)
+if get_settings().async_db_enabled:
+    app.include_router(async_reads.router)
 app.include_router(accounts.router)
 app.include_router(bills.router)
+app.include_router(dashboard.router)
 app.include_router(payment_methods.router)
 app.include_router(payments.router)
+app.include_router(stats.router)
 app.include_router(tasks.router)
 
 
@@ -34,3 +59,9 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/health/cache")
+def cache_stats():
+    """Hit/miss counters of the account and payment method cache."""
+    return lookup_cache.stats()
@@ -1,7 +1,10 @@
 from .account import Account
 from .bill import Bill
+from .driver_session import DriverSession
 from .payment import Payment
 from .payment_method import PaymentMethod
+from .resource_version import ResourceVersion
+from .spending_rollup import SpendingRollup
 from .task import Task
 
-__all__ = ["Account", "Bill", "Payment", "PaymentMethod", "Task"]
+__all__ = ["Account", "Bill", "DriverSession", "Payment", "PaymentMethod", "ResourceVersion", "SpendingRollup", "Task"]
@@ -14,6 +14,7 @@ class Account(Base):
     website_url = Column(String, nullable=True)
     driver_name = Column(String, nullable=True)
     identifiers = Column(JSON, default=dict)  # {"numero_cliente": "123", ...}
+    sync_freshness_seconds = Column(Integer, nullable=True)  # overrides the driver/default window
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -20,3 +20,13 @@ class Bill(Base):
 
     account = relationship("Account", back_populates="bills")
     payments = relationship("Payment", back_populates="bill")
+
+    __table_args__ = (
+        Index("uq_bills_account_id_external_id", "account_id", "external_id", unique=True),
+        # GET /bills/ filters and ordering
+        Index("ix_bills_account_id_status_due_date", "account_id", "status", "due_date"),
+        Index("ix_bills_status_due_date", "status", "due_date"),
+        # Unfiltered and per-account lists in keyset order (due_date, id), without a sort
+        Index("ix_bills_due_date_id", "due_date", "id"),
+        Index("ix_bills_account_id_due_date_id", "account_id", "due_date", "id"),
+    )
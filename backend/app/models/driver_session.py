@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, DateTime, LargeBinary, ForeignKey
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class DriverSession(Base):
+    __tablename__ = "driver_sessions"
+
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    encrypted_state = Column(LargeBinary, nullable=False)  # Fernet-encrypted Playwright storage_state
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
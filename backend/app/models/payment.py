@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -11,7 +11,7 @@ class Payment(Base):
     id = Column(Integer, primary_key=True, index=True)
     account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
     payment_method_id = Column(Integer, ForeignKey("payment_methods.id"), nullable=True)
-    bill_id = Column(Integer, ForeignKey("bills.id"), nullable=True)
+    bill_id = Column(Integer, ForeignKey("bills.id"), nullable=True, index=True)
     amount = Column(Numeric(10, 2), nullable=False)
     paid_at = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(String, default="completed")  # pending, completed, failed
@@ -20,3 +20,10 @@ class Payment(Base):
     account = relationship("Account", back_populates="payments")
     payment_method = relationship("PaymentMethod", back_populates="payments")
     bill = relationship("Bill", back_populates="payments")
+
+    __table_args__ = (
+        # GET /payments/?account_id=... ordered by paid_at
+        Index("ix_payments_account_id_paid_at", "account_id", "paid_at"),
+        # Unfiltered GET /payments/ in keyset order (paid_at, id)
+        Index("ix_payments_paid_at_id", "paid_at", "id"),
+    )
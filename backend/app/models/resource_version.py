@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String
+
+from ..database import Base
+
+
+class ResourceVersion(Base):
+    """Change counter per table, behind the ETags of the read endpoints (see services/resource_versions.py)."""
+    __tablename__ = "resource_versions"
+
+    resource = Column(String, primary_key=True)  # table name
+    version = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Index
+
+from ..database import Base
+
+# payment_method_id of payments without a card and of unpaid bill dues
+NO_PAYMENT_METHOD = 0
+
+
+class SpendingRollup(Base):
+    """Monthly totals derived from payments and unpaid bills (see services/rollups.py)."""
+    __tablename__ = "spending_rollups"
+
+    id = Column(Integer, primary_key=True)
+    # No foreign keys: derived data, rebuilt with `python -m app.cli rebuild-rollups`
+    account_id = Column(Integer, nullable=False)
+    payment_method_id = Column(Integer, nullable=False, default=NO_PAYMENT_METHOD, server_default="0")
+    month = Column(String(7), nullable=False)  # YYYY-MM (paid_at for payments, due_date for bills)
+    currency = Column(String, nullable=False)
+    paid_cents = Column(Integer, nullable=False, default=0, server_default="0")
+    payment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    due_cents = Column(Integer, nullable=False, default=0, server_default="0")  # unpaid bills
+    due_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("uq_spending_rollups_key", "account_id", "payment_method_id", "month", "currency", unique=True),
+        Index("ix_spending_rollups_month", "month"),
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Index, text
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 from ..database import Base
@@ -8,11 +9,38 @@ class Task(Base):
     __tablename__ = "tasks"
 
     id = Column(String, primary_key=True)  # UUID
-    type = Column(String, nullable=False)  # sync, pay
+    type = Column(String, nullable=False)  # sync, pay, pay_bills, backfill, sync_all, pay_all
     status = Column(String, default="pending")  # pending, running, completed, failed
-    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    priority = Column(Integer, nullable=False, default=1, server_default="1")  # lower runs first
+    parent_id = Column(String, ForeignKey("tasks.id"), nullable=True, index=True)  # bulk operations
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)  # null for parent tasks
+    driver_name = Column(String, nullable=True)
     bill_id = Column(Integer, ForeignKey("bills.id"), nullable=True)
-    result = Column(JSON, nullable=True)
+    bill_ids = Column(JSON, nullable=True)  # pay_bills: bills of one account paid in a single driver run
+    payment_method_id = Column(Integer, ForeignKey("payment_methods.id"), nullable=True)
+    result = deferred(Column(JSON, nullable=True))  # full driver output, loaded only when read
     error = Column(String, nullable=True)
+    progress = Column(String, nullable=True)  # last progress message reported by the driver
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Queue bookkeeping (see services/task_executor.py)
+    worker_id = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_tasks_status_priority_created_at", "status", "priority", "created_at"),
+        # Per-account lookups (in-flight and recent syncs)
+        Index("ix_tasks_account_id_status_created_at", "account_id", "status", "created_at"),
+        # GET /tasks/ (newest first, optionally by type/status or driver) and GET /stats/tasks
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_type_status_created_at_id", "type", "status", "created_at", "id"),
+        Index("ix_tasks_driver_name_created_at_id", "driver_name", "created_at", "id"),
+        # At most one sync queued or running per account, even for concurrent requests
+        Index(
+            "uq_tasks_sync_in_flight", "account_id", unique=True,
+            sqlite_where=text("type = 'sync' AND status IN ('pending', 'running')"),
+        ),
+    )
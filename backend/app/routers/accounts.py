@@ -1,16 +1,24 @@
 import re
-import threading
-import uuid
+from datetime import date, datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import Select, select
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
+from ..config import get_settings
 from ..database import get_db
 from ..models.account import Account
+from ..models.bill import Bill
 from ..models.task import Task
-from ..schemas.account import AccountCreate, AccountUpdate, AccountResponse
+from ..schemas.account import AccountCreate, AccountUpdate, AccountResponse, AccountSyncFilter
+from ..services import lookup_cache
 from ..services.driver_runner import driver_exists
+from ..services.session_cache import clear_session
+from ..services.task_executor import finish_parent, new_task, task_executor
+from ..utils.etag import conditional
+from ..utils.pagination import MAX_PAGE_SIZE, ndjson_response, paginate
 
 
 def generate_driver_name(name: str) -> str:
@@ -22,14 +30,35 @@ def generate_driver_name(name: str) -> str:
 router = APIRouter(prefix="/accounts", tags=["accounts"])
 
 
-@router.get("/", response_model=List[AccountResponse])
-def list_accounts(db: Session = Depends(get_db)):
-    return db.query(Account).all()
+def accounts_query() -> Select:
+    """Shared by the sync and async (routers/async_reads.py) endpoints."""
+    return select(Account).order_by(Account.id)
 
 
-@router.get("/{account_id}", response_model=AccountResponse)
+# Keyset of accounts_query's ORDER BY (ascending)
+ACCOUNTS_KEYSET = (Account.id,)
+
+
+@router.get("/", response_model=List[AccountResponse], dependencies=[Depends(conditional("accounts"))])
+def list_accounts(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    format: Literal["json", "ndjson"] = Query("json"),
+    db: Session = Depends(get_db),
+):
+    query = accounts_query()
+    if format == "ndjson":
+        return ndjson_response(query, AccountResponse)
+    if limit is None and cursor is None:
+        return lookup_cache.accounts(db)
+    return paginate(db, query, ACCOUNTS_KEYSET, limit, cursor, response, descending=False,
+                    schema=AccountResponse)
+
+
+@router.get("/{account_id}", response_model=AccountResponse, dependencies=[Depends(conditional("accounts"))])
 def get_account(account_id: int, db: Session = Depends(get_db)):
-    account = db.query(Account).filter(Account.id == account_id).first()
+    account = lookup_cache.account(db, account_id)
     if not account:
         raise HTTPException(status_code=404, detail="Cuenta no encontrada")
     return account
@@ -43,6 +72,7 @@ def create_account(account: AccountCreate, db: Session = Depends(get_db)):
     db_account = Account(**data)
     db.add(db_account)
     db.commit()
+    lookup_cache.invalidate_accounts()
     db.refresh(db_account)
     return db_account
 
@@ -58,6 +88,9 @@ def update_account(account_id: int, account: AccountUpdate, db: Session = Depend
         setattr(db_account, field, value)
 
     db.commit()
+    lookup_cache.invalidate_accounts()
+    if "identifiers" in update_data or "driver_name" in update_data:
+        clear_session(account_id)  # the cached login belongs to the old credentials
     db.refresh(db_account)
     return db_account
 
@@ -68,31 +101,160 @@ def delete_account(account_id: int, db: Session = Depends(get_db)):
     if not db_account:
         raise HTTPException(status_code=404, detail="Cuenta no encontrada")
 
+    clear_session(account_id)
+    # Keep the task history, detached from the account (tasks.account_id is a foreign key)
+    db.query(Task).filter(Task.account_id == account_id).update(
+        {Task.account_id: None}, synchronize_session=False
+    )
     db.delete(db_account)
     db.commit()
+    lookup_cache.invalidate_accounts()
     return {"message": "Cuenta eliminada"}
 
 
+def sync_freshness_seconds(account: AccountResponse) -> int:
+    """Freshness window for an account: its own, else its driver's, else the default."""
+    if account.sync_freshness_seconds is not None:
+        return account.sync_freshness_seconds
+    settings = get_settings()
+    return settings.sync_freshness_by_driver.get(account.driver_name, settings.sync_freshness_seconds)
+
+
+def existing_sync(db: Session, account: AccountResponse, force: bool) -> tuple[str, Task] | None:
+    """A sync that makes a new one unnecessary: ("coalesced", task) if one is
+    already queued or running, ("fresh", task) if the last one finished within
+    the account's freshness window (ignored with `force`)."""
+    # Join a sync that is already queued or running instead of scraping twice
+    in_flight = db.query(Task).filter(
+        Task.account_id == account.id,
+        Task.type == "sync",
+        Task.status.in_(("pending", "running")),
+    ).order_by(Task.created_at.desc()).first()
+    if in_flight:
+        return "coalesced", in_flight
+
+    freshness = sync_freshness_seconds(account)
+    if not force and freshness > 0:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=freshness)
+        recent = db.query(Task).filter(
+            Task.account_id == account.id,
+            Task.type == "sync",
+            Task.status == "completed",
+            Task.finished_at >= cutoff,
+        ).order_by(Task.finished_at.desc()).first()
+        if recent:
+            return "fresh", recent
+    return None
+
+
+def start_sync(db: Session, account: AccountResponse, force: bool,
+               parent_id: str | None = None) -> tuple[str | None, Task]:
+    """Queue a sync unless existing_sync() finds one: (None, new task) or
+    (reason, existing task). Not committed.
+
+    The unique index uq_tasks_sync_in_flight turns the insert into a no-op
+    when a concurrent request queued a sync after our check; that one is
+    then returned as coalesced.
+    """
+    while True:
+        existing = existing_sync(db, account, force)
+        if existing:
+            return existing
+        task = new_task("sync", account.id, account.driver_name, parent_id=parent_id)
+        values = {column.name: getattr(task, column.key) for column in Task.__table__.columns}
+        values = {name: value for name, value in values.items() if value is not None}
+        if db.execute(insert(Task).values(values).on_conflict_do_nothing()).rowcount:
+            return None, task
+
+
 @router.post("/{account_id}/sync")
-def sync_account(account_id: int, db: Session = Depends(get_db)):
-    account = db.query(Account).filter(Account.id == account_id).first()
+def sync_account(
+    account_id: int,
+    force: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    account = lookup_cache.account(db, account_id)
     if not account:
         raise HTTPException(status_code=404, detail="Cuenta no encontrada")
     if not account.driver_name or not driver_exists(account.driver_name):
         raise HTTPException(status_code=400, detail="No hay driver disponible para esta cuenta")
 
-    task_id = str(uuid.uuid4())
-    task = Task(
-        id=task_id,
-        type="sync",
-        status="pending",
-        account_id=account_id,
-    )
+    reason, task = start_sync(db, account, force)
+    if reason:
+        return {"task_id": task.id, reason: True}
+    db.commit()
+    task_executor.notify()
+
+    return {"task_id": task.id}
+
+
+@router.post("/{account_id}/backfill")
+def backfill_account(account_id: int, db: Session = Depends(get_db)):
+    """Import the paid history (driver `history`) as PAID bills with their payments."""
+    account = lookup_cache.account(db, account_id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Cuenta no encontrada")
+    if not account.driver_name or not driver_exists(account.driver_name):
+        raise HTTPException(status_code=400, detail="No hay driver disponible para esta cuenta")
+
+    task = new_task("backfill", account_id, account.driver_name)
     db.add(task)
     db.commit()
+    task_executor.notify()
+
+    return {"task_id": task.id}
+
+
+@router.post("/sync")
+def sync_accounts(
+    filters: Optional[AccountSyncFilter] = None,
+    force: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    """Sync many accounts at once: one child task per account under a parent task.
 
-    from .bills import _run_sync_task
-    thread = threading.Thread(target=_run_sync_task, args=(task_id, account_id))
-    thread.start()
+    Same rules as POST /accounts/{id}/sync: a sync already queued or running is
+    reused (adopted as a child when it has no parent), accounts synced within
+    their freshness window are skipped unless `force`.
+    """
+    filters = filters or AccountSyncFilter()
+    query = db.query(Account).filter(Account.driver_name.is_not(None))
+    if filters.driver_name:
+        query = query.filter(Account.driver_name == filters.driver_name)
+    if filters.account_ids is not None:  # [] selects no account
+        query = query.filter(Account.id.in_(filters.account_ids))
+    if filters.due_within_days is not None:
+        due_soon = db.query(Bill.account_id).filter(
+            Bill.status == "UNPAID",
+            Bill.due_date <= date.today() + timedelta(days=filters.due_within_days),
+        )
+        query = query.filter(Account.id.in_(due_soon))
+
+    accounts = [a for a in query.order_by(Account.id).all() if driver_exists(a.driver_name)]
+    if not accounts:
+        raise HTTPException(status_code=400, detail="No hay cuentas con driver para sincronizar")
+
+    parent = new_task("sync_all", None, None)
+    parent.status = "running"  # never claimed; closed by its last child
+    db.add(parent)
+    db.flush()  # before adopting children (tasks.parent_id is a foreign key)
+    total = 0
+    coalesced, fresh = {}, {}
+    for account in accounts:
+        reason, task = start_sync(db, AccountResponse.model_validate(account), force, parent.id)
+        if reason is None:
+            total += 1
+            continue
+        if reason == "fresh":
+            fresh[account.id] = task.id
+            continue
+        coalesced[account.id] = task.id
+        if task.parent_id is None:
+            task.parent_id = parent.id  # adopted: the parent waits for it too
+            total += 1
+    db.commit()
+    task_executor.notify()
+    # Closes the parent right away if there is nothing left to wait for
+    finish_parent(db, parent.id)
 
-    return {"task_id": task_id}
+    return {"task_id": parent.id, "total": total, "coalesced": coalesced, "fresh": fresh}
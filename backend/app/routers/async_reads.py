@@ -0,0 +1,102 @@
+"""Async versions of the most polled read endpoints (ASYNC_DB_ENABLED).
+
+Mounted ahead of the sync routers, so they answer the same paths without
+taking a threadpool worker per request. Queries are shared with the sync
+endpoints.
+"""
+from typing import List, Literal, Optional, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from ..models.task import Task
+from ..schemas.account import AccountResponse
+from ..schemas.bill import BillResponse
+from ..schemas.payment import PaymentResponse
+from ..schemas.task import TaskResponse
+from ..services import lookup_cache
+from ..utils import fast_json
+from ..utils.etag import conditional_async
+from ..utils.pagination import MAX_PAGE_SIZE, ndjson_response, page_result, page_statement
+from .accounts import ACCOUNTS_KEYSET, accounts_query
+from .bills import BILLS_KEYSET, bills_query
+from .payments import PAYMENTS_KEYSET, payments_query
+from .tasks import task_response
+
+router = APIRouter()
+
+
+async def _paginate(db: AsyncSession, query: Select, columns: Sequence, limit: Optional[int],
+                    cursor: Optional[str], response: Response, descending: bool = True,
+                    schema=None):
+    """Async counterpart of utils.pagination.paginate."""
+    fast = fast_json.enabled(schema)
+    statement, size = page_statement(query, columns, limit, cursor, descending, schema if fast else None)
+    result = await db.execute(statement)
+    rows = result.all() if fast else result.scalars().all()
+    return page_result(rows, columns, size, response, fast)
+
+
+@router.get("/accounts/", response_model=List[AccountResponse], tags=["accounts"], include_in_schema=False,
+            dependencies=[Depends(conditional_async("accounts"))])
+async def list_accounts_async(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    format: Literal["json", "ndjson"] = Query("json"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    query = accounts_query()
+    if format == "ndjson":
+        return ndjson_response(query, AccountResponse)
+    if limit is None and cursor is None:
+        return await db.run_sync(lookup_cache.accounts)
+    return await _paginate(db, query, ACCOUNTS_KEYSET, limit, cursor, response, descending=False,
+                           schema=AccountResponse)
+
+
+@router.get("/bills/", response_model=List[BillResponse], tags=["bills"], include_in_schema=False,
+            dependencies=[Depends(conditional_async("bills"))])
+async def list_bills_async(
+    response: Response,
+    account_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    format: Literal["json", "ndjson"] = Query("json"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    query = bills_query(account_id, status)
+    if format == "ndjson":
+        return ndjson_response(query, BillResponse)
+    return await _paginate(db, query, BILLS_KEYSET, limit, cursor, response, schema=BillResponse)
+
+
+@router.get("/payments/", response_model=List[PaymentResponse], tags=["payments"], include_in_schema=False,
+            dependencies=[Depends(conditional_async("payments"))])
+async def list_payments_async(
+    response: Response,
+    account_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    format: Literal["json", "ndjson"] = Query("json"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    query = payments_query(account_id)
+    if format == "ndjson":
+        return ndjson_response(query, PaymentResponse)
+    return await _paginate(db, query, PAYMENTS_KEYSET, limit, cursor, response, schema=PaymentResponse)
+
+
+@router.get("/tasks/{task_id}", response_model=TaskResponse, tags=["tasks"], include_in_schema=False)
+async def get_task_async(
+    task_id: str,
+    include: Optional[Literal["result"]] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    task = await db.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada")
+    return await db.run_sync(lambda session: task_response(session, task, include_result=include == "result"))
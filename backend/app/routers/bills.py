@@ -1,38 +1,82 @@
-import threading
-import uuid
+import time
 from datetime import date, datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from ..database import get_db, SessionLocal
-from ..models.account import Account
 from ..models.bill import Bill
 from ..models.payment import Payment
-from ..models.payment_method import PaymentMethod
 from ..models.task import Task
-from ..schemas.bill import BillResponse
+from ..schemas.bill import BillPayRequest, BillResponse
+from ..config import get_settings
+from ..services import lookup_cache
+from ..services.bill_sync import record_paid_bills, upsert_bills
 from ..services.driver_runner import run_driver, driver_exists
+from ..services.rollups import RollupChanges
+from ..services.task_executor import new_task, task_executor
+from ..utils.etag import conditional
+from ..utils.export import ExportFormat, export_response
+from ..utils.pagination import MAX_PAGE_SIZE, ndjson_response, paginate
 
 router = APIRouter(prefix="/bills", tags=["bills"])
 
+# Minimum seconds between progress writes to the task row
+PROGRESS_INTERVAL = 1.0
+MAX_PROGRESS_LENGTH = 200
 
-@router.get("/", response_model=List[BillResponse])
+
+def bills_query(account_id: Optional[int] = None, status: Optional[str] = None) -> Select:
+    """Shared by the sync and async (routers/async_reads.py) endpoints."""
+    query = select(Bill)
+    if account_id is not None:
+        query = query.where(Bill.account_id == account_id)
+    if status is not None:
+        query = query.where(Bill.status == status)
+    return query.order_by(Bill.due_date.desc(), Bill.id.desc())
+
+
+# Keyset of bills_query's ORDER BY (descending)
+BILLS_KEYSET = (Bill.due_date, Bill.id)
+
+
+@router.get("/", response_model=List[BillResponse], dependencies=[Depends(conditional("bills"))])
 def list_bills(
+    response: Response,
     account_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    format: Literal["json", "ndjson"] = Query("json"),
     db: Session = Depends(get_db),
 ):
-    query = db.query(Bill)
-    if account_id is not None:
-        query = query.filter(Bill.account_id == account_id)
-    if status is not None:
-        query = query.filter(Bill.status == status)
-    return query.order_by(Bill.due_date.desc()).all()
+    query = bills_query(account_id, status)
+    if format == "ndjson":
+        return ndjson_response(query, BillResponse)
+    return paginate(db, query, BILLS_KEYSET, limit, cursor, response, schema=BillResponse)
+
 
+@router.get("/export")
+def export_bills(
+    format: ExportFormat = Query("csv"),
+    account_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    due_from: Optional[date] = Query(None, description="Inclusive"),
+    due_to: Optional[date] = Query(None, description="Exclusive"),
+    gzip: bool = Query(False),
+):
+    """Stream bills as CSV or NDJSON, latest due date first."""
+    query = bills_query(account_id, status)
+    if due_from:
+        query = query.where(Bill.due_date >= due_from)
+    if due_to:
+        query = query.where(Bill.due_date < due_to)
+    return export_response(query, BillResponse, format, "bills", gzip)
 
-@router.get("/{bill_id}", response_model=BillResponse)
+
+@router.get("/{bill_id}", response_model=BillResponse, dependencies=[Depends(conditional("bills"))])
 def get_bill(bill_id: int, db: Session = Depends(get_db)):
     bill = db.query(Bill).filter(Bill.id == bill_id).first()
     if not bill:
@@ -40,45 +84,69 @@ def get_bill(bill_id: int, db: Session = Depends(get_db)):
     return bill
 
 
+class _ProgressRecorder:
+    """Driver event callback that stores `progress` messages on the task.
+
+    Writes at most every PROGRESS_INTERVAL seconds, committing the task's
+    session, so it must only be used between writes. The newest message is
+    always kept: `flush()` puts it on the task for the task's final commit.
+    Other events are passed on to `on_event`.
+    """
+
+    def __init__(self, db: Session, task: Task, on_event=None):
+        self.db = db
+        self.task = task
+        self.on_event = on_event
+        self.last_write = 0.0
+        self.pending: str | None = None
+
+    def __call__(self, event: dict):
+        if event.get("type") != "progress":
+            if self.on_event:
+                self.on_event(event)
+            return
+        self.pending = str(event.get("message", ""))[:MAX_PROGRESS_LENGTH]
+        now = time.monotonic()
+        if now - self.last_write >= PROGRESS_INTERVAL:
+            self.last_write = now
+            self.flush()
+            self.db.commit()
+
+    def flush(self):
+        """Set the newest unwritten message on the task (does not commit)."""
+        if self.pending is not None:
+            self.task.progress = self.pending
+            self.pending = None
+
+
 def _run_sync_task(task_id: str, account_id: int):
     db = SessionLocal()
     try:
         task = db.query(Task).filter(Task.id == task_id).first()
-        task.status = "running"
-        db.commit()
 
-        account = db.query(Account).filter(Account.id == account_id).first()
-        result = run_driver(account.driver_name, "fetch", account.identifiers)
+        account = lookup_cache.account(db, account_id)
+        progress = _ProgressRecorder(db, task)
+        result = run_driver(
+            account.driver_name, "fetch", account.identifiers,
+            on_event=progress,
+            account_id=account.id,
+        )
+        progress.flush()
 
         if result.get("errors"):
             task.status = "failed"
             task.error = "; ".join(result["errors"])
         else:
-            for bill_data in result.get("bills", []):
-                existing = db.query(Bill).filter(
-                    Bill.account_id == account_id,
-                    Bill.external_id == bill_data["id"],
-                ).first()
-                if existing:
-                    existing.amount_cents = bill_data["amountCents"]
-                    existing.currency = bill_data.get("currency", "ARS")
-                    existing.due_date = date.fromisoformat(bill_data["dueDate"])
-                    existing.status = bill_data["status"]
-                else:
-                    db.add(Bill(
-                        account_id=account_id,
-                        external_id=bill_data["id"],
-                        amount_cents=bill_data["amountCents"],
-                        currency=bill_data.get("currency", "ARS"),
-                        due_date=date.fromisoformat(bill_data["dueDate"]),
-                        status=bill_data["status"],
-                    ))
+            result["summary"] = upsert_bills(
+                db, account_id, result.get("bills", []), full_snapshot=True,
+            )
             task.status = "completed"
 
         task.result = result
         task.finished_at = datetime.now(timezone.utc)
         db.commit()
     except Exception as e:
+        db.rollback()
         task = db.query(Task).filter(Task.id == task_id).first()
         if task:
             task.status = "failed"
@@ -89,27 +157,89 @@ def _run_sync_task(task_id: str, account_id: int):
         db.close()
 
 
-def _run_pay_task(task_id: str, bill_id: int, payment_method_id: Optional[int]):
+def _run_backfill_task(task_id: str, account_id: int):
+    """Import paid history, writing each batch while the driver is still scraping."""
+    settings = get_settings()
     db = SessionLocal()
     try:
         task = db.query(Task).filter(Task.id == task_id).first()
-        task.status = "running"
+        account = lookup_cache.account(db, account_id)
+
+        summary = {"received": 0, "inserted": 0, "updated": 0, "unchanged": 0, "payments_created": 0}
+        pending: list[dict] = []
+
+        def flush():
+            counts = upsert_bills(db, account_id, pending)
+            summary["payments_created"] += record_paid_bills(db, account_id, pending)
+            summary["received"] += len(pending)
+            for key in ("inserted", "updated", "unchanged"):
+                summary[key] += counts[key]
+            task.result = {"summary": dict(summary)}
+            db.commit()
+            pending.clear()
+
+        def on_event(event):
+            if event.get("type") == "bills":
+                pending.extend(event.get("bills", []))
+                if len(pending) >= settings.backfill_batch_size:
+                    flush()
+
+        progress = _ProgressRecorder(db, task, on_event)
+        result = run_driver(
+            account.driver_name, "history", account.identifiers,
+            on_event=progress,
+            timeout=settings.backfill_timeout,
+            account_id=account.id,
+        )
+        progress.flush()
+
+        # Drivers that don't stream return every bill in the final result
+        for bill_data in result.pop("bills", []):
+            pending.append(bill_data)
+            if len(pending) >= settings.backfill_batch_size:
+                flush()
+        if pending:
+            flush()
+
+        if result.get("errors"):
+            task.status = "failed"
+            task.error = "; ".join(result["errors"])
+        else:
+            task.status = "completed"
+
+        task.result = {**result, "summary": summary}
+        task.finished_at = datetime.now(timezone.utc)
         db.commit()
+    except Exception as e:
+        db.rollback()
+        task = db.query(Task).filter(Task.id == task_id).first()
+        if task:
+            task.status = "failed"
+            task.error = str(e)
+            task.finished_at = datetime.now(timezone.utc)
+            db.commit()
+    finally:
+        db.close()
 
-        bill = db.query(Bill).filter(Bill.id == bill_id).first()
-        account = db.query(Account).filter(Account.id == bill.account_id).first()
 
-        encrypted_card = None
-        if payment_method_id:
-            pm = db.query(PaymentMethod).filter(PaymentMethod.id == payment_method_id).first()
-            if pm:
-                encrypted_card = pm.encrypted_data
+def _run_pay_task(task_id: str, bill_id: int, payment_method_id: Optional[int]):
+    db = SessionLocal()
+    try:
+        task = db.query(Task).filter(Task.id == task_id).first()
+
+        bill = db.query(Bill).filter(Bill.id == bill_id).first()
+        account = lookup_cache.account(db, bill.account_id)
+        encrypted_card = lookup_cache.card_data(db, payment_method_id) if payment_method_id else None
 
+        progress = _ProgressRecorder(db, task)
         result = run_driver(
             account.driver_name, "pay", account.identifiers,
-            bill_id=bill.external_id,
+            bill_ids=[bill.external_id],
             encrypted_card=encrypted_card,
+            on_event=progress,
+            account_id=account.id,
         )
+        progress.flush()
 
         if result.get("errors"):
             task.status = "failed"
@@ -117,21 +247,123 @@ def _run_pay_task(task_id: str, bill_id: int, payment_method_id: Optional[int]):
         else:
             bill_data = result.get("bill", {})
             if bill_data.get("status") == "PAID":
+                rollups = RollupChanges()
+                rollups.unpaid_bill(bill.account_id, bill.due_date, bill.currency,
+                                    bill.amount_cents, bill.status, sign=-1)
                 bill.status = "PAID"
                 bill.paid_at = datetime.now(timezone.utc)
-                db.add(Payment(
+                payment = Payment(
                     account_id=bill.account_id,
                     payment_method_id=payment_method_id,
                     bill_id=bill.id,
                     amount=bill.amount_cents / 100,
+                    paid_at=bill.paid_at,
                     status="completed",
-                ))
+                )
+                db.add(payment)
+                rollups.payment(payment.account_id, payment_method_id, payment.paid_at,
+                                payment.amount, payment.status, bill.currency)
+                rollups.apply(db)
             task.status = "completed"
 
         task.result = result
         task.finished_at = datetime.now(timezone.utc)
         db.commit()
     except Exception as e:
+        db.rollback()
+        task = db.query(Task).filter(Task.id == task_id).first()
+        if task:
+            task.status = "failed"
+            task.error = str(e)
+            task.finished_at = datetime.now(timezone.utc)
+            db.commit()
+    finally:
+        db.close()
+
+
+def _run_pay_bills_task(task_id: str, bill_ids: list[int], payment_method_id: Optional[int]):
+    """Pay several bills of one account in a single driver run (one login).
+
+    Every bill the driver reports as PAID gets its Payment, in one transaction
+    with the task result, even if the run fails halfway: that money was paid.
+    """
+    db = SessionLocal()
+    try:
+        task = db.query(Task).filter(Task.id == task_id).first()
+
+        found = {bill.id: bill for bill in db.query(Bill).filter(Bill.id.in_(bill_ids))}
+        bills = [found[bill_id] for bill_id in bill_ids if bill_id in found]
+        account = lookup_cache.account(db, task.account_id)
+        encrypted_card = lookup_cache.card_data(db, payment_method_id) if payment_method_id else None
+
+        reported: dict[str, dict] = {}  # driver bill objects by external id
+
+        def on_event(event):
+            # Drivers may report each bill as soon as it is paid
+            if event.get("type") == "bills":
+                for bill_data in event.get("bills", []):
+                    reported[str(bill_data.get("id"))] = bill_data
+
+        progress = _ProgressRecorder(db, task, on_event)
+        result = run_driver(
+            account.driver_name, "pay", account.identifiers,
+            bill_ids=[bill.external_id for bill in bills],
+            encrypted_card=encrypted_card,
+            on_event=progress,
+            account_id=account.id,
+        )
+        progress.flush()
+        # Drivers that pay a single bill answer with "bill"
+        for bill_data in [*result.get("bills", []), *([result["bill"]] if result.get("bill") else [])]:
+            reported[str(bill_data.get("id"))] = bill_data
+
+        rollups = RollupChanges()
+        paid_at = datetime.now(timezone.utc)
+        outcomes, payments = [], []
+        for bill_id in bill_ids:
+            bill = found.get(bill_id)
+            if bill is None:
+                outcomes.append({"bill_id": bill_id, "paid": False, "error": "Factura no encontrada"})
+                continue
+            bill_data = reported.get(bill.external_id, {})
+            outcome = {"bill_id": bill.id, "external_id": bill.external_id, "paid": bill_data.get("status") == "PAID"}
+            outcomes.append(outcome)
+            if not outcome["paid"]:
+                outcome["error"] = bill_data.get("error") or "El driver no confirmó el pago"
+                continue
+            rollups.unpaid_bill(bill.account_id, bill.due_date, bill.currency,
+                                bill.amount_cents, bill.status, sign=-1)
+            bill.status = "PAID"
+            bill.paid_at = paid_at
+            payment = Payment(
+                account_id=bill.account_id,
+                payment_method_id=payment_method_id,
+                bill_id=bill.id,
+                amount=bill.amount_cents / 100,
+                paid_at=paid_at,
+                status="completed",
+            )
+            db.add(payment)
+            payments.append((outcome, payment))
+            rollups.payment(payment.account_id, payment_method_id, paid_at,
+                            payment.amount, payment.status, bill.currency)
+        rollups.apply(db)
+        db.flush()
+        for outcome, payment in payments:
+            outcome["payment_id"] = payment.id
+
+        unpaid = len(bill_ids) - len(payments)
+        if result.get("errors") or unpaid:
+            task.status = "failed"
+            task.error = "; ".join(result.get("errors") or [f"{unpaid} de {len(bill_ids)} facturas no se pagaron"])
+        else:
+            task.status = "completed"
+
+        task.result = {**result, "results": outcomes, "summary": {"requested": len(bill_ids), "paid": len(payments)}}
+        task.finished_at = datetime.now(timezone.utc)
+        db.commit()
+    except Exception as e:
+        db.rollback()
         task = db.query(Task).filter(Task.id == task_id).first()
         if task:
             task.status = "failed"
@@ -142,6 +374,46 @@ def _run_pay_task(task_id: str, bill_id: int, payment_method_id: Optional[int]):
         db.close()
 
 
+@router.post("/pay")
+def pay_bills(data: BillPayRequest, db: Session = Depends(get_db)):
+    """Pay several bills: one task per account, each paying all of that
+    account's bills in a single driver run, under a parent task."""
+    bill_ids = list(dict.fromkeys(data.bill_ids))
+    bills = {bill.id: bill for bill in db.query(Bill).filter(Bill.id.in_(bill_ids))}
+    if len(bills) < len(bill_ids):
+        raise HTTPException(status_code=404, detail="Factura no encontrada")
+    paid = [bill_id for bill_id in bill_ids if bills[bill_id].status == "PAID"]
+    if paid:
+        raise HTTPException(status_code=400, detail=f"Facturas ya pagadas: {', '.join(map(str, paid))}")
+    if data.payment_method_id is not None and not lookup_cache.payment_method(db, data.payment_method_id):
+        raise HTTPException(status_code=404, detail="Medio de pago no encontrado")
+
+    by_account: dict[int, list[int]] = {}
+    for bill_id in bill_ids:
+        by_account.setdefault(bills[bill_id].account_id, []).append(bill_id)
+    accounts = [lookup_cache.account(db, account_id) for account_id in by_account]
+    for account in accounts:
+        if not account.driver_name or not driver_exists(account.driver_name):
+            raise HTTPException(status_code=400, detail=f"No hay driver disponible para la cuenta {account.name}")
+
+    parent = new_task("pay_all", None, None, payment_method_id=data.payment_method_id)
+    parent.status = "running"  # never claimed; closed by its last child
+    db.add(parent)
+    db.add_all(
+        new_task(
+            "pay_bills", account.id, account.driver_name,
+            parent_id=parent.id,
+            bill_ids=by_account[account.id],
+            payment_method_id=data.payment_method_id,
+        )
+        for account in accounts
+    )
+    db.commit()
+    task_executor.notify()
+
+    return {"task_id": parent.id, "total": len(accounts)}
+
+
 @router.post("/{bill_id}/pay")
 def pay_bill(
     bill_id: int,
@@ -152,22 +424,17 @@ def pay_bill(
     if not bill:
         raise HTTPException(status_code=404, detail="Factura no encontrada")
 
-    account = db.query(Account).filter(Account.id == bill.account_id).first()
+    account = lookup_cache.account(db, bill.account_id)
     if not account.driver_name or not driver_exists(account.driver_name):
         raise HTTPException(status_code=400, detail="No hay driver disponible para esta cuenta")
 
-    task_id = str(uuid.uuid4())
-    task = Task(
-        id=task_id,
-        type="pay",
-        status="pending",
-        account_id=account.id,
+    task = new_task(
+        "pay", account.id, account.driver_name,
         bill_id=bill_id,
+        payment_method_id=payment_method_id,
     )
     db.add(task)
     db.commit()
+    task_executor.notify()
 
-    thread = threading.Thread(target=_run_pay_task, args=(task_id, bill_id, payment_method_id))
-    thread.start()
-
-    return {"task_id": task_id}
+    return {"task_id": task.id}
@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, contains_eager, load_only, raiseload
+
+from ..database import get_db
+from ..models.account import Account
+from ..models.bill import Bill
+from ..models.payment import Payment
+from ..models.task import Task
+from ..schemas.bill import BillResponse
+from ..schemas.dashboard import DashboardResponse
+from ..schemas.payment import PaymentResponse
+from ..services.driver_runner import driver_exists
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+RECENT_PAYMENTS = 10
+
+
+def last_syncs(db: Session) -> dict[int, Task]:
+    """The most recent sync task of each account, in one query."""
+    ranked = (
+        select(
+            Task.id,
+            func.row_number().over(
+                partition_by=Task.account_id, order_by=(Task.created_at.desc(), Task.id.desc())
+            ).label("rank"),
+        )
+        .where(Task.type == "sync", Task.account_id.is_not(None))
+        .subquery()
+    )
+    query = (
+        select(Task)
+        .join(ranked, ranked.c.id == Task.id)
+        .where(ranked.c.rank == 1)
+        .options(load_only(Task.account_id, Task.status, Task.created_at, Task.finished_at, Task.error))
+    )
+    return {task.account_id: task for task in db.scalars(query)}
+
+
+@router.get("/", response_model=DashboardResponse)
+def get_dashboard(
+    payments_limit: int = Query(RECENT_PAYMENTS, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Everything the main screen shows, in four queries (no lazy loads)."""
+    accounts = db.scalars(select(Account).order_by(Account.id).options(raiseload("*"))).all()
+    drivers = {a.driver_name: driver_exists(a.driver_name) for a in accounts if a.driver_name}
+    unpaid = db.scalars(
+        select(Bill)
+        .join(Bill.account)
+        .where(Bill.status == "UNPAID")
+        .order_by(Bill.due_date, Bill.id)
+        .options(contains_eager(Bill.account), raiseload("*"))
+    ).all()
+    syncs = last_syncs(db)
+    payments = db.scalars(
+        select(Payment)
+        .join(Payment.account)
+        .order_by(Payment.paid_at.desc(), Payment.id.desc())
+        .limit(payments_limit)
+        .options(contains_eager(Payment.account), raiseload("*"))
+    ).all()
+
+    unpaid_count: dict[int, int] = {}
+    next_due: dict = {}
+    for bill in unpaid:
+        unpaid_count[bill.account_id] = unpaid_count.get(bill.account_id, 0) + 1
+        next_due.setdefault(bill.account_id, bill.due_date)  # bills come by due date
+
+    return {
+        "accounts": [
+            {
+                "id": account.id,
+                "name": account.name,
+                "driver_name": account.driver_name,
+                "driver_available": drivers.get(account.driver_name, False),
+                "unpaid_count": unpaid_count.get(account.id, 0),
+                "next_due_date": next_due.get(account.id),
+                "last_sync": {
+                    "task_id": sync.id,
+                    "status": sync.status,
+                    "created_at": sync.created_at,
+                    "finished_at": sync.finished_at,
+                    "error": sync.error,
+                } if (sync := syncs.get(account.id)) else None,
+            }
+            for account in accounts
+        ],
+        "unpaid_bills": [
+            {
+                **BillResponse.model_validate(bill).model_dump(),
+                "account_name": bill.account.name,
+                "driver_available": drivers.get(bill.account.driver_name, False),
+            }
+            for bill in unpaid
+        ],
+        "next_due_date": unpaid[0].due_date if unpaid else None,
+        "recent_payments": [
+            {**PaymentResponse.model_validate(payment).model_dump(), "account_name": payment.account.name}
+            for payment in payments
+        ],
+    }
@@ -4,20 +4,24 @@ from typing import List
 
 from ..database import get_db
 from ..models.payment_method import PaymentMethod
+from ..models.task import Task
 from ..schemas.payment_method import PaymentMethodCreate, PaymentMethodUpdate, PaymentMethodResponse
+from ..services import lookup_cache
 from ..services.encryption import encrypt_card_data
+from ..utils.etag import conditional
 
 router = APIRouter(prefix="/payment-methods", tags=["payment_methods"])
 
 
-@router.get("/", response_model=List[PaymentMethodResponse])
+@router.get("/", response_model=List[PaymentMethodResponse], dependencies=[Depends(conditional("payment_methods"))])
 def list_payment_methods(db: Session = Depends(get_db)):
-    return db.query(PaymentMethod).all()
+    return lookup_cache.payment_methods(db)
 
 
-@router.get("/{method_id}", response_model=PaymentMethodResponse)
+@router.get("/{method_id}", response_model=PaymentMethodResponse,
+            dependencies=[Depends(conditional("payment_methods"))])
 def get_payment_method(method_id: int, db: Session = Depends(get_db)):
-    method = db.query(PaymentMethod).filter(PaymentMethod.id == method_id).first()
+    method = lookup_cache.payment_method(db, method_id)
     if not method:
         raise HTTPException(status_code=404, detail="Medio de pago no encontrado")
     return method
@@ -43,6 +47,7 @@ def create_payment_method(data: PaymentMethodCreate, db: Session = Depends(get_d
     )
     db.add(db_method)
     db.commit()
+    lookup_cache.invalidate_payment_methods()
     db.refresh(db_method)
     return db_method
 
@@ -57,6 +62,7 @@ def update_payment_method(method_id: int, data: PaymentMethodUpdate, db: Session
         method.name = data.name
 
     db.commit()
+    lookup_cache.invalidate_payment_methods()
     db.refresh(method)
     return method
 
@@ -67,6 +73,10 @@ def delete_payment_method(method_id: int, db: Session = Depends(get_db)):
     if not method:
         raise HTTPException(status_code=404, detail="Medio de pago no encontrado")
 
+    db.query(Task).filter(Task.payment_method_id == method_id).update(
+        {Task.payment_method_id: None}, synchronize_session=False
+    )
     db.delete(method)
     db.commit()
+    lookup_cache.invalidate_payment_methods()
     return {"message": "Medio de pago eliminado"}
@@ -1,24 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 
 from ..database import get_db
 from ..models.payment import Payment
-from ..models.account import Account
-from ..schemas.payment import PaymentCreate, PaymentResponse
+from ..schemas.payment import PaymentCreate, PaymentImportResult, PaymentResponse
+from ..services import lookup_cache, payment_import
+from ..services.rollups import RollupChanges
+from ..utils.etag import conditional
+from ..utils.export import ExportFormat, export_response
+from ..utils.pagination import MAX_PAGE_SIZE, ndjson_response, paginate
+from .tasks import naive_utc
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
 
-@router.get("/", response_model=List[PaymentResponse])
-def list_payments(account_id: Optional[int] = None, db: Session = Depends(get_db)):
-    query = db.query(Payment)
+def payments_query(account_id: Optional[int] = None) -> Select:
+    """Shared by the sync and async (routers/async_reads.py) endpoints."""
+    query = select(Payment)
     if account_id:
-        query = query.filter(Payment.account_id == account_id)
-    return query.order_by(Payment.paid_at.desc()).all()
+        query = query.where(Payment.account_id == account_id)
+    return query.order_by(Payment.paid_at.desc(), Payment.id.desc())
 
 
-@router.get("/{payment_id}", response_model=PaymentResponse)
+# Keyset of payments_query's ORDER BY (descending)
+PAYMENTS_KEYSET = (Payment.paid_at, Payment.id)
+
+
+@router.get("/", response_model=List[PaymentResponse], dependencies=[Depends(conditional("payments"))])
+def list_payments(
+    response: Response,
+    account_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    format: Literal["json", "ndjson"] = Query("json"),
+    db: Session = Depends(get_db),
+):
+    query = payments_query(account_id)
+    if format == "ndjson":
+        return ndjson_response(query, PaymentResponse)
+    return paginate(db, query, PAYMENTS_KEYSET, limit, cursor, response, schema=PaymentResponse)
+
+
+@router.get("/export")
+def export_payments(
+    format: ExportFormat = Query("csv"),
+    account_id: Optional[int] = None,
+    paid_from: Optional[datetime] = Query(None, description="Inclusive"),
+    paid_to: Optional[datetime] = Query(None, description="Exclusive"),
+    gzip: bool = Query(False),
+):
+    """Stream the payment history as CSV or NDJSON, newest first."""
+    query = payments_query(account_id)
+    if paid_from:
+        query = query.where(Payment.paid_at >= naive_utc(paid_from))
+    if paid_to:
+        query = query.where(Payment.paid_at < naive_utc(paid_to))
+    return export_response(query, PaymentResponse, format, "payments", gzip)
+
+
+@router.get("/{payment_id}", response_model=PaymentResponse, dependencies=[Depends(conditional("payments"))])
 def get_payment(payment_id: int, db: Session = Depends(get_db)):
     payment = db.query(Payment).filter(Payment.id == payment_id).first()
     if not payment:
@@ -29,8 +73,7 @@ def get_payment(payment_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=PaymentResponse)
 def create_payment(data: PaymentCreate, db: Session = Depends(get_db)):
     # Verify account exists
-    account = db.query(Account).filter(Account.id == data.account_id).first()
-    if not account:
+    if not lookup_cache.account(db, data.account_id):
         raise HTTPException(status_code=404, detail="Cuenta no encontrada")
 
     payment_data = data.model_dump(exclude_unset=True)
@@ -40,17 +83,51 @@ def create_payment(data: PaymentCreate, db: Session = Depends(get_db)):
 
     db_payment = Payment(**payment_data)
     db.add(db_payment)
+    db.flush()
+    db.refresh(db_payment)  # server defaults (paid_at, status) for the rollup
+
+    rollups = RollupChanges()
+    rollups.payment(db_payment.account_id, db_payment.payment_method_id, db_payment.paid_at,
+                    db_payment.amount, db_payment.status, db_payment.bill.currency if db_payment.bill else None)
+    rollups.apply(db)
     db.commit()
     db.refresh(db_payment)
     return db_payment
 
 
+@router.post("/import", response_model=PaymentImportResult)
+async def import_payments(
+    request: Request,
+    format: payment_import.ImportFormat = Query("csv"),
+    dry_run: bool = Query(False),
+):
+    """Import payments from a CSV (header row) or NDJSON request body, in batches.
+
+    Invalid rows are skipped and reported; `dry_run` only validates.
+    """
+    job = payment_import.PaymentImport(dry_run)
+    await run_in_threadpool(job.load_ids)
+    try:
+        async for row, data, error in payment_import.records(request.stream(), format):
+            job.add(row, data, error)
+            if job.batch_full:
+                await run_in_threadpool(job.flush)
+    except payment_import.InvalidEncoding:
+        raise HTTPException(status_code=400, detail="El archivo debe estar en UTF-8")
+    await run_in_threadpool(job.flush)
+    return job.report()
+
+
 @router.delete("/{payment_id}")
 def delete_payment(payment_id: int, db: Session = Depends(get_db)):
     payment = db.query(Payment).filter(Payment.id == payment_id).first()
     if not payment:
         raise HTTPException(status_code=404, detail="Pago no encontrado")
 
+    rollups = RollupChanges()
+    rollups.payment(payment.account_id, payment.payment_method_id, payment.paid_at,
+                    payment.amount, payment.status, payment.bill.currency if payment.bill else None, sign=-1)
+    rollups.apply(db)
     db.delete(payment)
     db.commit()
     return {"message": "Pago eliminado"}
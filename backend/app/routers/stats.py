@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from ..database import get_db
+from ..schemas.stats import StatsResponse
+from ..schemas.task import TaskStatsResponse
+from ..services import rollups
+from ..services.task_stats import task_stats
+from ..utils.etag import conditional
+from .tasks import task_filters
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+
+# spending_rollups only changes along with bills and payments
+@router.get("/", response_model=StatsResponse, dependencies=[Depends(conditional("bills", "payments"))])
+def get_stats(
+    from_month: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    to_month: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    account_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Monthly spending and dues, read from the spending_rollups table."""
+    return rollups.stats(db, from_month, to_month, account_id)
+
+
+@router.get("/tasks", response_model=TaskStatsResponse)
+def get_task_stats(filters: list = Depends(task_filters), db: Session = Depends(get_db)):
+    """Task counts by status and p50/p95 durations per driver (same filters as GET /tasks/)."""
+    return {"drivers": task_stats(db, filters)}
@@ -1,16 +1,177 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..config import get_settings
+from ..database import SessionLocal, get_db
 from ..models.task import Task
-from ..schemas.task import TaskResponse
+from ..schemas.task import TaskResponse, TaskSummary
+from ..services.task_events import TERMINAL_STATUSES, task_event_bus
+from ..services.task_executor import PARENT_TYPES, child_counts, queue_position
+from ..utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Keyset of tasks_query's ORDER BY (descending)
+TASKS_KEYSET = (Task.created_at, Task.id)
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Stored as naive UTC
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def task_filters(
+    type: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    account_id: Optional[int] = Query(None),
+    driver_name: Optional[str] = Query(None),
+    parent_id: Optional[str] = Query(None, description="Children of a bulk task"),
+    created_from: Optional[datetime] = Query(None, description="Inclusive"),
+    created_to: Optional[datetime] = Query(None, description="Exclusive"),
+) -> list:
+    """Filters shared by GET /tasks/ and GET /stats/tasks."""
+    filters = []
+    if type:
+        filters.append(Task.type == type)
+    if status:
+        filters.append(Task.status == status)
+    if account_id is not None:
+        filters.append(Task.account_id == account_id)
+    if driver_name:
+        filters.append(Task.driver_name == driver_name)
+    if parent_id:
+        filters.append(Task.parent_id == parent_id)
+    if created_from:
+        filters.append(Task.created_at >= naive_utc(created_from))
+    if created_to:
+        filters.append(Task.created_at < naive_utc(created_to))
+    return filters
+
+
+def tasks_query(filters: list) -> Select:
+    return select(Task).where(*filters).order_by(Task.created_at.desc(), Task.id.desc())
+
+
+def task_response(db: Session, task: Task, include_result: bool = False) -> TaskResponse:
+    """GET /tasks/{id} body: live progress for parents, queue position while pending.
+
+    Read-only: parents are closed by the executor when their last child ends.
+    The stored `result` (deferred column) is only loaded with `include_result`,
+    except for parents: theirs is just the final child counts.
+    """
+    progress = None
+    if task.type in PARENT_TYPES and task.status == "running":
+        progress = child_counts(db, task.id)
+
+    response = TaskResponse.from_task(task, include_result or task.type in PARENT_TYPES)
+    if progress is not None:
+        response.result = progress
+    if task.status == "pending":
+        response.queue_position = queue_position(db, task)
+    return response
+
+
+def _load_task(task_id: str) -> dict | None:
+    with SessionLocal() as db:
+        task = db.query(Task).filter(Task.id == task_id).first()
+        if not task:
+            return None
+        return task_response(db, task).model_dump(mode="json")
+
+
+def _sse(data: dict) -> str:
+    return f"data: {json.dumps(data)}\n\n"
+
+
+@router.get("/", response_model=List[TaskSummary])
+def list_tasks(
+    response: Response,
+    filters: list = Depends(task_filters),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Newest first, always paginated (X-Next-Cursor)."""
+    return paginate(db, tasks_query(filters), TASKS_KEYSET, limit, cursor, response, schema=TaskSummary)
+
 
 @router.get("/{task_id}", response_model=TaskResponse)
-def get_task(task_id: str, db: Session = Depends(get_db)):
+def get_task(
+    task_id: str,
+    include: Optional[Literal["result"]] = Query(None),
+    db: Session = Depends(get_db),
+):
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Tarea no encontrada")
-    return task
+    return task_response(db, task, include_result=include == "result")
+
+
+@router.get("/{task_id}/events")
+async def task_events(task_id: str, request: Request):
+    """Server-Sent Events: the task now and on every change, until it finishes.
+
+    Changes arrive through the in-process event bus. The database is read again
+    only when a child of a parent task changes (for the aggregated progress) and
+    every TASK_EVENTS_FALLBACK_INTERVAL seconds without events, which covers
+    tasks run by a standalone worker process.
+    """
+    settings = get_settings()
+    # Subscribe before reading so no change between the read and the stream is lost
+    subscription = task_event_bus.subscribe(task_id)
+    try:
+        snapshot = await run_in_threadpool(_load_task, task_id)
+    except Exception:
+        subscription.close()
+        raise
+    if snapshot is None:
+        subscription.close()
+        raise HTTPException(status_code=404, detail="Tarea no encontrada")
+
+    async def stream():
+        current = snapshot
+        quiet = 0.0
+        try:
+            yield _sse(current)
+            while current["status"] not in TERMINAL_STATUSES:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.get(), timeout=settings.task_events_keepalive
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    quiet += settings.task_events_keepalive
+                    if quiet < settings.task_events_fallback_interval:
+                        yield ": keepalive\n\n"
+                        continue
+                    message = {"type": "reload"}
+
+                quiet = 0.0
+                if message["type"] == "task" and current["type"] not in PARENT_TYPES:
+                    latest = {**message["task"], "queue_position": None}
+                else:
+                    latest = await run_in_threadpool(_load_task, task_id)
+                    if latest is None:
+                        return
+                if latest != current:
+                    current = latest
+                    yield _sse(current)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
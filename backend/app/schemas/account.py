@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class AccountBase(BaseModel):
@@ -9,6 +9,7 @@ class AccountBase(BaseModel):
     website_url: Optional[str] = None
     driver_name: Optional[str] = None
     identifiers: dict = {}
+    sync_freshness_seconds: Optional[int] = None
 
 
 class AccountCreate(AccountBase):
@@ -21,6 +22,7 @@ class AccountUpdate(BaseModel):
     website_url: Optional[str] = None
     driver_name: Optional[str] = None
     identifiers: Optional[dict] = None
+    sync_freshness_seconds: Optional[int] = None
 
 
 class AccountResponse(AccountBase):
@@ -30,3 +32,9 @@ class AccountResponse(AccountBase):
 
     class Config:
         from_attributes = True
+
+
+class AccountSyncFilter(BaseModel):
+    driver_name: Optional[str] = None
+    due_within_days: Optional[int] = None  # only accounts with unpaid bills due in N days
+    account_ids: Optional[List[int]] = None
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class BillResponse(BaseModel):
@@ -16,3 +16,8 @@ class BillResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BillPayRequest(BaseModel):
+    bill_ids: List[int] = Field(min_length=1)
+    payment_method_id: Optional[int] = None
@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import List, Optional
+
+from .bill import BillResponse
+from .payment import PaymentResponse
+
+
+class LastSync(BaseModel):
+    task_id: str
+    status: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class DashboardAccount(BaseModel):
+    id: int
+    name: str
+    driver_name: Optional[str] = None
+    driver_available: bool
+    unpaid_count: int
+    next_due_date: Optional[date] = None
+    last_sync: Optional[LastSync] = None
+
+
+class DashboardBill(BillResponse):
+    account_name: str
+    driver_available: bool
+
+
+class DashboardPayment(PaymentResponse):
+    account_name: str
+
+
+class DashboardResponse(BaseModel):
+    accounts: List[DashboardAccount]
+    unpaid_bills: List[DashboardBill]  # by due date
+    next_due_date: Optional[date] = None
+    recent_payments: List[DashboardPayment]  # newest first
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 
 
@@ -23,3 +23,18 @@ class PaymentResponse(PaymentBase):
 
     class Config:
         from_attributes = True
+
+
+class PaymentImportError(BaseModel):
+    row: int  # CSV: line of the record, the header is row 1; NDJSON: line number
+    errors: List[str]
+
+
+class PaymentImportResult(BaseModel):
+    dry_run: bool
+    rows: int
+    valid: int
+    invalid: int
+    imported: int
+    errors: List[PaymentImportError]  # at most 1000
+    errors_truncated: bool
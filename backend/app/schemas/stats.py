@@ -0,0 +1,46 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class AccountSpending(BaseModel):
+    month: str  # YYYY-MM
+    account_id: int
+    currency: str
+    paid_cents: int
+    payment_count: int
+
+
+class PaymentMethodSpending(BaseModel):
+    month: str
+    payment_method_id: int  # 0: payments without a card
+    currency: str
+    paid_cents: int
+    payment_count: int
+
+
+class CurrencySpending(BaseModel):
+    month: str
+    currency: str
+    paid_cents: int
+    payment_count: int
+
+
+class MonthlyDues(BaseModel):
+    month: str
+    currency: str
+    due_cents: int
+    due_count: int
+
+
+class OverdueTotal(BaseModel):
+    currency: str
+    due_cents: int
+    due_count: int
+
+
+class StatsResponse(BaseModel):
+    by_account: List[AccountSpending]
+    by_payment_method: List[PaymentMethodSpending]
+    by_currency: List[CurrencySpending]
+    upcoming_dues: List[MonthlyDues]  # unpaid bills due this month or later
+    overdue: List[OverdueTotal]  # unpaid bills due before this month
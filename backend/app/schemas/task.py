@@ -1,18 +1,62 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, Any
+from typing import Any, Dict, List, Optional
 
 
 class TaskResponse(BaseModel):
     id: str
     type: str
     status: str
-    account_id: int
+    parent_id: Optional[str] = None
+    account_id: Optional[int] = None
     bill_id: Optional[int] = None
+    bill_ids: Optional[List[int]] = None
     result: Optional[Any] = None
     error: Optional[str] = None
+    progress: Optional[str] = None
     created_at: datetime
     finished_at: Optional[datetime] = None
+    queue_position: Optional[int] = None  # 1-based claim order, only while pending
 
     class Config:
         from_attributes = True
+
+    @classmethod
+    def from_task(cls, task, include_result: bool = False) -> "TaskResponse":
+        """Build from a Task without touching the deferred `result` unless asked."""
+        fields = {name: getattr(task, name) for name in cls.model_fields if name not in ("result", "queue_position")}
+        if include_result:
+            fields["result"] = task.result
+        return cls(**fields)
+
+
+class TaskSummary(BaseModel):
+    """Item of GET /tasks/ (no result)."""
+    id: str
+    type: str
+    status: str
+    parent_id: Optional[str] = None
+    account_id: Optional[int] = None
+    driver_name: Optional[str] = None
+    bill_id: Optional[int] = None
+    bill_ids: Optional[List[int]] = None
+    error: Optional[str] = None
+    progress: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DriverTaskStats(BaseModel):
+    driver_name: Optional[str] = None  # null: parent tasks
+    total: int
+    by_status: Dict[str, int]
+    p50_seconds: Optional[float] = None  # finished_at - created_at, finished tasks only
+    p95_seconds: Optional[float] = None
+
+
+class TaskStatsResponse(BaseModel):
+    drivers: List[DriverTaskStats]
@@ -0,0 +1,115 @@
+"""Set-based writes of driver bills into the `bills` table."""
+from datetime import date, datetime, time, timezone
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from ..models.bill import Bill
+from ..models.payment import Payment
+from .rollups import RollupChanges
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+_COMPARED = ("amount_cents", "currency", "due_date", "status")
+
+
+def _row(account_id: int, bill_data: dict) -> dict:
+    return {
+        "account_id": account_id,
+        "external_id": bill_data["id"],
+        "amount_cents": bill_data["amountCents"],
+        "currency": bill_data.get("currency", "ARS"),
+        "due_date": date.fromisoformat(bill_data["dueDate"]),
+        "status": bill_data["status"],
+    }
+
+
+def upsert_bills(db: Session, account_id: int, bills_data: list[dict],
+                 full_snapshot: bool = False) -> dict:
+    """Insert new bills and update changed ones with one SELECT ... IN per chunk.
+
+    With `full_snapshot` (a `fetch` returns every unpaid bill), UNPAID bills the
+    driver no longer reports are counted as disappeared. Does not commit.
+    """
+    rows = {b["id"]: _row(account_id, b) for b in bills_data}  # last one wins on duplicates
+    external_ids = list(rows)
+
+    existing: dict[str, Bill] = {}
+    for start in range(0, len(external_ids), CHUNK_SIZE):
+        chunk = external_ids[start:start + CHUNK_SIZE]
+        for bill in db.query(Bill).filter(Bill.account_id == account_id, Bill.external_id.in_(chunk)):
+            existing[bill.external_id] = bill
+
+    inserts, updates = [], []
+    rollups = RollupChanges()
+    for external_id, row in rows.items():
+        bill = existing.get(external_id)
+        if bill is None:
+            inserts.append(row)
+        elif any(getattr(bill, field) != row[field] for field in _COMPARED):
+            updates.append({"id": bill.id, **{field: row[field] for field in _COMPARED}})
+            rollups.unpaid_bill(account_id, bill.due_date, bill.currency, bill.amount_cents, bill.status, sign=-1)
+        else:
+            continue
+        rollups.unpaid_bill(account_id, row["due_date"], row["currency"], row["amount_cents"], row["status"])
+
+    if inserts:
+        db.execute(insert(Bill), inserts)
+    if updates:
+        db.execute(update(Bill), updates)
+    rollups.apply(db)
+
+    disappeared = 0
+    if full_snapshot:
+        disappeared = db.query(Bill).filter(
+            Bill.account_id == account_id,
+            Bill.status == "UNPAID",
+            Bill.external_id.not_in(external_ids),
+        ).count()
+
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "unchanged": len(rows) - len(inserts) - len(updates),
+        "disappeared": disappeared,
+    }
+
+
+def record_paid_bills(db: Session, account_id: int, bills_data: list[dict]) -> int:
+    """Set paid_at on imported PAID bills and create their missing Payment rows.
+
+    Uses the driver's `paidDate` when present, else the due date. Returns the
+    number of payments created. Does not commit.
+    """
+    paid_dates = {
+        b["id"]: date.fromisoformat(b.get("paidDate") or b["dueDate"])
+        for b in bills_data if b["status"] == "PAID"
+    }
+    external_ids = list(paid_dates)
+
+    created = 0
+    rollups = RollupChanges()
+    for start in range(0, len(external_ids), CHUNK_SIZE):
+        chunk = external_ids[start:start + CHUNK_SIZE]
+        bills = db.query(Bill).filter(
+            Bill.account_id == account_id,
+            Bill.external_id.in_(chunk),
+            ~Bill.payments.any(),
+        ).execution_options(populate_existing=True)
+        for bill in bills:
+            paid_at = datetime.combine(paid_dates[bill.external_id], time(), tzinfo=timezone.utc)
+            if bill.paid_at is None:
+                bill.paid_at = paid_at
+            db.add(Payment(
+                account_id=account_id,
+                bill_id=bill.id,
+                amount=bill.amount_cents / 100,
+                paid_at=paid_at,
+                status="completed",
+                notes="Importado del historial",
+            ))
+            rollups.payment(account_id, None, paid_at, bill.amount_cents / 100, "completed", bill.currency)
+            created += 1
+    rollups.apply(db)
+    return created
@@ -0,0 +1,301 @@
+"""Long-lived driver workers.
+
+A driver that implements the `serve` command stays alive between jobs and keeps
+its interpreter and browser warm. Messages are framed as one JSON object per
+line on stdin/stdout (see docs/driver_spec.md, "Worker Mode").
+"""
+import atexit
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import IO, Iterator
+
+from ..config import get_settings
+
+PROTOCOL_VERSION = 1
+
+TOO_LONG = object()  # stands for a discarded stdout line in DriverWorker._lines
+
+# After a failed start (crash, timeout, garbage on stdout) jobs run one-shot and
+# the next start is tried after a delay that doubles up to the maximum
+START_RETRY_DELAY = 5.0
+START_RETRY_MAX_DELAY = 300.0
+
+
+class WorkerError(Exception):
+    pass
+
+
+def bounded_lines(stream: IO[str], limit: int) -> Iterator[str | None]:
+    """Lines of a text stream, never holding more than `limit` characters of
+    one: a longer line is read through, discarded and yielded as None."""
+    while True:
+        line = stream.readline(limit + 1)
+        if not line:
+            return
+        if len(line) <= limit or line.endswith("\n"):
+            yield line
+            continue
+        while line and not line.endswith("\n"):
+            line = stream.readline(limit)
+        yield None
+
+
+def message_too_long_error() -> str:
+    return f"El driver envió un mensaje de más de {get_settings().driver_max_message_mb} MB"
+
+
+class ProtocolUnsupported(WorkerError):
+    pass
+
+
+def _process_tree_rss_kb(pid: int) -> int:
+    """Resident memory of a process and all its descendants, in KB (Linux only)."""
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return 0
+
+    children: dict[int, list[int]] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # Field 4 (ppid) comes after the parenthesized command name
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+
+    page_kb = os.sysconf("SC_PAGE_SIZE") // 1024
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            total += int((proc / str(current) / "statm").read_text().split()[1]) * page_kb
+        except (OSError, IndexError, ValueError):
+            pass
+        pending.extend(children.get(current, []))
+    return total
+
+
+class DriverWorker:
+    def __init__(self, script: Path):
+        self.script = script
+        self.jobs = 0
+        self._next_id = 0
+        self._lines: queue.Queue = queue.Queue()
+        self._stderr: deque = deque(maxlen=50)
+        self.proc = subprocess.Popen(
+            ["uv", "run", str(script), "serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    def _read_stdout(self):
+        limit = get_settings().driver_max_message_mb * 1024 * 1024
+        for line in bounded_lines(self.proc.stdout, limit):
+            self._lines.put(line if line is not None else TOO_LONG)
+        self._lines.put(None)  # EOF
+
+    def _read_stderr(self):
+        for line in self.proc.stderr:
+            self._stderr.append(line.rstrip())
+
+    def stderr_tail(self) -> str:
+        return "\n".join(self._stderr)[-500:]
+
+    def _read_message(self, timeout: float) -> dict:
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                raise WorkerError(f"El worker no respondió en {int(timeout)}s")
+            if line is None:
+                raise WorkerError(f"El worker terminó inesperadamente: {self.stderr_tail()}")
+            if line is TOO_LONG:
+                raise WorkerError(message_too_long_error())
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                raise WorkerError(f"Respuesta inválida del worker: {line[:200]}")
+
+    def handshake(self, timeout: float):
+        """Wait for the ready message. Raises ProtocolUnsupported only when the
+        driver answers something else (e.g. a one-shot "Comando desconocido:
+        serve" result, or another protocol version); a crash or timeout is a
+        plain WorkerError."""
+        message = self._read_message(timeout)
+        ready = isinstance(message, dict) and message.get("ready")
+        if not ready or message.get("protocol") != PROTOCOL_VERSION:
+            raise ProtocolUnsupported(json.dumps(message)[:200])
+
+    def request(self, command: str, args: list[str], env: dict, timeout: float,
+                on_event=None) -> dict:
+        self._next_id += 1
+        request_id = self._next_id
+        message = {"id": request_id, "command": command, "args": args, "env": env}
+        try:
+            self.proc.stdin.write(json.dumps(message) + "\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            raise WorkerError(f"El worker terminó inesperadamente: {self.stderr_tail()}")
+
+        deadline = time.monotonic() + timeout
+        while True:
+            response = self._read_message(max(deadline - time.monotonic(), 0.1))
+            if response.get("id") != request_id:
+                raise WorkerError(f"Respuesta inválida del worker: {json.dumps(response)[:200]}")
+            if "event" in response:
+                if on_event:
+                    on_event(response["event"])
+                continue
+            if "result" not in response:
+                raise WorkerError(f"Respuesta inválida del worker: {json.dumps(response)[:200]}")
+            self.jobs += 1
+            return response["result"]
+
+    def rss_kb(self) -> int:
+        return _process_tree_rss_kb(self.proc.pid)
+
+    def stop(self):
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.write(json.dumps({"command": "shutdown"}) + "\n")
+                self.proc.stdin.flush()
+                self.proc.stdin.close()
+                self.proc.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
+
+
+class DriverPool:
+    def __init__(self, script: Path, size: int, max_jobs: int, max_rss_kb: int,
+                 startup_timeout: float):
+        self.script = script
+        self.size = max(size, 1)
+        self.max_jobs = max_jobs
+        self.max_rss_kb = max_rss_kb
+        self.startup_timeout = startup_timeout
+        self.supported = True
+        self._start_failures = 0
+        self._retry_at = 0.0  # time.monotonic() before which no worker is started
+        self._idle: list[DriverWorker] = []
+        self._count = 0
+        self._cond = threading.Condition()
+
+    def _acquire(self) -> DriverWorker | None:
+        with self._cond:
+            while True:
+                if not self.supported:
+                    return None
+                if self._idle:
+                    return self._idle.pop()
+                if time.monotonic() < self._retry_at:
+                    return None
+                if self._count < self.size:
+                    self._count += 1
+                    break
+                self._cond.wait()
+
+        worker = DriverWorker(self.script)
+        try:
+            worker.handshake(self.startup_timeout)
+        except WorkerError as e:
+            worker.stop()
+            with self._cond:
+                self._count -= 1
+                if isinstance(e, ProtocolUnsupported):
+                    self.supported = False
+                else:
+                    delay = START_RETRY_DELAY * 2 ** min(self._start_failures, 16)
+                    self._start_failures += 1
+                    self._retry_at = time.monotonic() + min(delay, START_RETRY_MAX_DELAY)
+                self._cond.notify_all()
+            return None
+        with self._cond:
+            self._start_failures = 0
+        return worker
+
+    def _release(self, worker: DriverWorker, healthy: bool):
+        recycle = (
+            not healthy
+            or worker.jobs >= self.max_jobs
+            or (self.max_rss_kb and worker.rss_kb() > self.max_rss_kb)
+        )
+        if recycle:
+            worker.stop()
+        with self._cond:
+            if recycle:
+                self._count -= 1
+            else:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    def run(self, command: str, args: list[str], env: dict, timeout: float,
+            on_event=None) -> dict | None:
+        """Run a job on a warm worker. Returns None if the driver has no worker mode."""
+        worker = self._acquire()
+        if worker is None:
+            return None
+
+        healthy = False
+        try:
+            result = worker.request(command, args, env, timeout, on_event)
+            healthy = True
+            return result
+        except WorkerError as e:
+            return {"errors": [str(e)], "bills": []}
+        finally:
+            self._release(worker, healthy)
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+        for worker in idle:
+            worker.stop()
+
+
+_pools: dict[Path, DriverPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(script: Path) -> DriverPool:
+    with _pools_lock:
+        pool = _pools.get(script)
+        if pool is None:
+            settings = get_settings()
+            pool = DriverPool(
+                script,
+                size=settings.driver_pool_size,
+                max_jobs=settings.driver_pool_max_jobs,
+                max_rss_kb=settings.driver_pool_max_rss_mb * 1024,
+                startup_timeout=settings.driver_pool_startup_timeout,
+            )
+            _pools[script] = pool
+        return pool
+
+
+@atexit.register
+def shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
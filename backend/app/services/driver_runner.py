@@ -1,19 +1,32 @@
 import json
+import logging
 import os
 import subprocess
+import threading
+from collections import deque
 from pathlib import Path
+from typing import Callable, Sequence
 
+from ..config import get_settings
+from ..services.driver_pool import bounded_lines, get_pool, message_too_long_error
 from ..services.encryption import decrypt_card_data
+from ..services.session_cache import load_session, save_session
 
 DRIVERS_DIR = Path(__file__).resolve().parent.parent.parent / "drivers"
+DRIVER_TIMEOUT = 120
+# Stay well below the kernel's 128KB limit for a single environment string
+MAX_SESSION_STATE_BYTES = 100_000
+
+logger = logging.getLogger(__name__)
 
 
 def driver_exists(driver_name: str) -> bool:
     return (DRIVERS_DIR / f"{driver_name}.py").is_file()
 
 
-def build_env(identifiers: dict, card_data: dict | None = None) -> dict:
-    env = {**os.environ}
+def build_job_env(identifiers: dict, card_data: dict | None = None) -> dict:
+    """Variables specific to one driver job (identifiers and card data)."""
+    env = {}
     for key, value in identifiers.items():
         env[key.upper()] = str(value)
     if card_data:
@@ -25,9 +38,30 @@ def build_env(identifiers: dict, card_data: dict | None = None) -> dict:
     return env
 
 
+def build_env(identifiers: dict, card_data: dict | None = None) -> dict:
+    return {**os.environ, **build_job_env(identifiers, card_data)}
+
+
 def run_driver(driver_name: str, command: str, identifiers: dict,
-               bill_id: str | None = None,
-               encrypted_card: bytes | None = None) -> dict:
+               bill_ids: Sequence[str] = (),
+               encrypted_card: bytes | None = None,
+               on_event: Callable[[dict], None] | None = None,
+               timeout: int = DRIVER_TIMEOUT,
+               account_id: int | None = None) -> dict:
+    """Run a driver command and return its final JSON result.
+
+    With `on_event`, the driver is asked to stream (DRIVER_STREAM=1) and every
+    intermediate event, e.g. `{"type": "progress", "message": "..."}` or
+    `{"type": "bills", "bills": [...]}`, is passed to the callback while the
+    driver runs. Drivers that don't stream return everything in the final
+    result instead.
+
+    With `account_id`, a cached browser session for the account is passed to
+    the driver (DRIVER_SESSION_STATE) and the one it returns is cached again.
+    Session cache errors are logged and never fail the job.
+
+    `pay` gets the external ids of the bills to pay as arguments, in order.
+    """
     script = DRIVERS_DIR / f"{driver_name}.py"
     if not script.is_file():
         return {"errors": [f"Driver '{driver_name}' no encontrado"], "bills": []}
@@ -36,28 +70,97 @@ def run_driver(driver_name: str, command: str, identifiers: dict,
     if encrypted_card and command == "pay":
         card_data = decrypt_card_data(encrypted_card)
 
-    env = build_env(identifiers, card_data)
+    args = list(bill_ids) if command == "pay" else []
+    job_env = build_job_env(identifiers, card_data)
+    if on_event:
+        job_env["DRIVER_STREAM"] = "1"
+    if account_id is not None:
+        try:
+            state = load_session(account_id)
+        except Exception:
+            logger.exception("Could not load the cached session of account %s", account_id)
+            state = None
+        if state is not None:
+            serialized = json.dumps(state)
+            if len(serialized) <= MAX_SESSION_STATE_BYTES:
+                job_env["DRIVER_SESSION_STATE"] = serialized
 
-    args = ["uv", "run", str(script), command]
-    if bill_id and command == "pay":
-        args.append(bill_id)
+    result = None
+    if get_settings().driver_pool_enabled:
+        result = get_pool(script).run(command, args, job_env, timeout=timeout, on_event=on_event)
+    if result is None:
+        result = _run_process(script, command, args, {**os.environ, **job_env}, on_event, timeout)
 
-    try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=120,
-            env=env,
-        )
-    except subprocess.TimeoutExpired:
-        return {"errors": ["El driver excedió el tiempo límite (120s)"], "bills": []}
-
-    if result.returncode != 0 and not result.stdout.strip():
-        stderr_msg = result.stderr.strip()[:500] if result.stderr else "Error desconocido"
-        return {"errors": [f"Driver falló (exit {result.returncode}): {stderr_msg}"], "bills": []}
+    session = result.pop("session", None)
+    if account_id is not None and session:
+        try:
+            save_session(account_id, session)
+        except Exception:
+            logger.exception("Could not cache the session of account %s", account_id)
+    return result
+
+
+def _run_process(script: Path, command: str, args: list[str], env: dict,
+                 on_event: Callable[[dict], None] | None, timeout: int) -> dict:
+    """Run a one-shot driver process, reading stdout line by line as it arrives.
+
+    Each line is one JSON message; only the final result is kept, and stderr is
+    reduced to its last lines, so a chatty driver doesn't grow memory. A line
+    longer than DRIVER_MAX_MESSAGE_MB is discarded as it is read and fails the
+    job.
+    """
+    proc = subprocess.Popen(
+        ["uv", "run", str(script), command, *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    stderr_tail: deque = deque(maxlen=50)
+    threading.Thread(target=lambda: stderr_tail.extend(proc.stderr), daemon=True).start()
 
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    result = None
+    too_long = False
     try:
-        return json.loads(result.stdout)
-    except json.JSONDecodeError:
-        return {"errors": [f"Respuesta inválida del driver: {result.stdout[:200]}"], "bills": []}
+        for line in bounded_lines(proc.stdout, get_settings().driver_max_message_mb * 1024 * 1024):
+            if line is None:
+                too_long = True
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                message = None
+            if not isinstance(message, dict):
+                result = {"errors": [f"Respuesta inválida del driver: {line[:200]}"], "bills": []}
+                continue
+            message_type = message.pop("type", None)
+            if message_type is None or message_type == "result":
+                result = message  # drivers that don't stream print a single object
+            elif on_event:
+                on_event({"type": message_type, **message})
+        proc.wait()
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+    if timed_out.is_set():
+        return {"errors": [f"El driver excedió el tiempo límite ({timeout}s)"], "bills": []}
+    if too_long:
+        return {"errors": [message_too_long_error()], "bills": []}
+    if result is None:
+        stderr_msg = "".join(stderr_tail).strip()[-500:] or "Error desconocido"
+        return {"errors": [f"Driver falló (exit {proc.returncode}): {stderr_msg}"], "bills": []}
+    return result
@@ -1,32 +1,47 @@
 import json
-from cryptography.fernet import Fernet
+from functools import lru_cache
+
+from cryptography.fernet import Fernet, MultiFernet
 
 from ..config import get_settings
 
 
-def get_fernet() -> Fernet:
+@lru_cache()
+def get_fernet() -> MultiFernet:
+    """Encrypts with CARD_ENCRYPTION_KEY, decrypts with it or any of CARD_ENCRYPTION_OLD_KEYS."""
     settings = get_settings()
     if not settings.card_encryption_key:
         raise ValueError("CARD_ENCRYPTION_KEY not configured")
-    return Fernet(settings.card_encryption_key.encode())
+    keys = [settings.card_encryption_key, *settings.card_encryption_old_keys]
+    return MultiFernet([Fernet(key.encode()) for key in keys])
+
+
+def encrypt_json(data) -> bytes:
+    """Encrypt any JSON-serializable value."""
+    return get_fernet().encrypt(json.dumps(data).encode())
+
+
+def decrypt_json(encrypted_data: bytes):
+    return json.loads(get_fernet().decrypt(encrypted_data).decode())
+
+
+def rotate_token(encrypted_data: bytes) -> bytes:
+    """Re-encrypt a token made with any configured key under CARD_ENCRYPTION_KEY."""
+    return get_fernet().rotate(encrypted_data)
 
 
 def encrypt_card_data(card_number: str, expiry_date: str, cvv: str) -> bytes:
     """Encrypt sensitive card data."""
-    fernet = get_fernet()
-    data = json.dumps({
+    return encrypt_json({
         "card_number": card_number,
         "expiry_date": expiry_date,
         "cvv": cvv
     })
-    return fernet.encrypt(data.encode())
 
 
 def decrypt_card_data(encrypted_data: bytes) -> dict:
     """Decrypt card data. Returns dict with card_number, expiry_date, cvv."""
-    fernet = get_fernet()
-    decrypted = fernet.decrypt(encrypted_data)
-    return json.loads(decrypted.decode())
+    return decrypt_json(encrypted_data)
 
 
 def generate_encryption_key() -> str:
@@ -0,0 +1,117 @@
+"""Re-encryption of stored secrets under the current CARD_ENCRYPTION_KEY, run
+with `python -m app.cli rotate-keys` after moving the previous key to
+CARD_ENCRYPTION_OLD_KEYS.
+
+Rows are read in primary key order, ROTATION_BATCH_SIZE at a time, and every
+batch is written in its own short transaction. SQLite has no server-side
+cursors and an open read would pin its snapshot for the whole run, so each
+batch is a fresh keyset query (`pk > last`) instead. After each commit the last
+key is saved to a checkpoint file; an interrupted run resumes from it, and
+re-encrypting a batch twice (a crash between commit and checkpoint) is harmless.
+"""
+import json
+import os
+from typing import Callable
+
+from cryptography.fernet import InvalidToken
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from ..models.driver_session import DriverSession
+from ..models.payment_method import PaymentMethod
+from .encryption import rotate_token
+
+ROTATION_BATCH_SIZE = 500
+
+# table -> (model, primary key, encrypted column)
+ROTATED_COLUMNS = {
+    "payment_methods": (PaymentMethod, PaymentMethod.id, PaymentMethod.encrypted_data),
+    "driver_sessions": (DriverSession, DriverSession.account_id, DriverSession.encrypted_state),
+}
+
+# Rows no configured key can read: sessions are a disposable cache and are
+# dropped; card data is not, so the rotation stops.
+DISPOSABLE = {"driver_sessions"}
+
+
+class UnreadableToken(Exception):
+    def __init__(self, table: str, row_id):
+        super().__init__(f"{table} {row_id}: not readable with the configured keys")
+        self.table = table
+        self.row_id = row_id
+
+
+def load_checkpoint(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_checkpoint(path: str, checkpoint: dict):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def rotate_table(
+    db: Session,
+    table: str,
+    after=None,
+    batch_size: int = ROTATION_BATCH_SIZE,
+    on_batch: Callable[[object], None] | None = None,
+) -> int:
+    """Re-encrypt the rows of `table` with a key greater than `after`. Commits
+    per batch and calls `on_batch(last_key)` after each commit."""
+    model, pk, column = ROTATED_COLUMNS[table]
+    rotated = 0
+    while True:
+        query = select(pk, column).order_by(pk).limit(batch_size)
+        if after is not None:
+            query = query.where(pk > after)
+        rows = db.execute(query).all()
+        if not rows:
+            return rotated
+        changes, unreadable = [], []
+        for row_id, token in rows:
+            try:
+                changes.append({pk.key: row_id, column.key: rotate_token(token)})
+            except InvalidToken:
+                if table not in DISPOSABLE:
+                    db.rollback()
+                    raise UnreadableToken(table, row_id)
+                unreadable.append(row_id)
+        if changes:
+            db.execute(update(model), changes)  # bulk UPDATE by primary key
+        if unreadable:
+            db.execute(delete(model).where(pk.in_(unreadable)).execution_options(synchronize_session=False))
+        db.commit()
+        rotated += len(changes)
+        after = rows[-1][0]
+        if on_batch:
+            on_batch(after)
+
+
+def rotate_keys(db: Session, checkpoint_path: str, batch_size: int = ROTATION_BATCH_SIZE) -> dict:
+    """Rotate every table in ROTATED_COLUMNS, resuming from `checkpoint_path`
+    if it exists. The checkpoint is removed once all tables are done."""
+    checkpoint = load_checkpoint(checkpoint_path)
+    counts = {}
+    for table in ROTATED_COLUMNS:
+        if checkpoint.get(table, {}).get("done"):
+            counts[table] = 0
+            continue
+
+        def on_batch(last_key, table=table):
+            checkpoint[table] = {"after": last_key}
+            save_checkpoint(checkpoint_path, checkpoint)
+
+        counts[table] = rotate_table(
+            db, table, checkpoint.get(table, {}).get("after"), batch_size, on_batch
+        )
+        checkpoint[table] = {"done": True}
+        save_checkpoint(checkpoint_path, checkpoint)
+    os.remove(checkpoint_path)
+    return counts
@@ -0,0 +1,140 @@
+"""In-process read-through cache for accounts and payment methods.
+
+These rows change a few times a month but are read on every request and task.
+Lookups return immutable snapshots (the response schemas, never ORM objects,
+which belong to one session) kept for CACHE_TTL_SECONDS, at most
+CACHE_MAX_ENTRIES per cache, least recently used evicted first.
+
+Each entry remembers the `resource_versions` counter of its table (the one
+behind the ETags) and is only used while the counter is unchanged, so a write
+from any process (another API worker, a standalone `app.worker`) is seen on the
+next lookup, at the cost of a primary key read. Writes in routers/accounts.py
+and routers/payment_methods.py also call `invalidate_*` to free the entries.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models.account import Account
+from ..models.payment_method import PaymentMethod
+from ..schemas.account import AccountResponse
+from ..schemas.payment_method import PaymentMethodResponse
+from .resource_versions import current_versions
+
+T = TypeVar("T")
+
+ALL = "all"  # key of the full list
+
+
+class TTLCache:
+    """Thread-safe LRU cache of rows of `name` (a table in resource_versions).
+
+    Entries expire `ttl` seconds after being loaded, or as soon as the table's
+    version counter moves.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, int, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by invalidate: loads started before it aren't stored
+        self.hits = self.misses = self.evictions = 0
+
+    def get_or_load(self, db: Session, key: Hashable, load: Callable[[], T]) -> T:
+        """Cached value of `key`, else `load()`; None results are not cached."""
+        if self.ttl <= 0:
+            return load()
+        # Read before loading: a write in between leaves the entry already stale
+        version = current_versions(db, (self.name,))[self.name]
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and entry[1] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            generation = self._generation
+
+        value = load()
+        if value is None:
+            return value
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl, version, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_settings = get_settings()
+account_cache = TTLCache("accounts", _settings.cache_max_entries, _settings.cache_ttl_seconds)
+payment_method_cache = TTLCache("payment_methods", _settings.cache_max_entries, _settings.cache_ttl_seconds)
+
+
+def account(db: Session, account_id: int) -> AccountResponse | None:
+    def load():
+        row = db.get(Account, account_id)
+        return AccountResponse.model_validate(row) if row else None
+    return account_cache.get_or_load(db, account_id, load)
+
+
+def accounts(db: Session) -> list[AccountResponse]:
+    def load():
+        return tuple(AccountResponse.model_validate(row) for row in db.query(Account).order_by(Account.id))
+    return list(account_cache.get_or_load(db, ALL, load))
+
+
+def payment_method(db: Session, method_id: int) -> PaymentMethodResponse | None:
+    def load():
+        row = db.get(PaymentMethod, method_id)
+        return PaymentMethodResponse.model_validate(row) if row else None
+    return payment_method_cache.get_or_load(db, method_id, load)
+
+
+def payment_methods(db: Session) -> list[PaymentMethodResponse]:
+    def load():
+        rows = db.query(PaymentMethod).order_by(PaymentMethod.id)
+        return tuple(PaymentMethodResponse.model_validate(row) for row in rows)
+    return list(payment_method_cache.get_or_load(db, ALL, load))
+
+
+def card_data(db: Session, method_id: int) -> bytes | None:
+    """Encrypted card data of a payment method, for the pay task."""
+    def load():
+        return db.query(PaymentMethod.encrypted_data).filter(PaymentMethod.id == method_id).scalar()
+    return payment_method_cache.get_or_load(db, ("card", method_id), load)
+
+
+def invalidate_accounts():
+    account_cache.invalidate()
+
+
+def invalidate_payment_methods():
+    payment_method_cache.invalidate()
+
+
+def stats() -> dict:
+    return {cache.name: cache.stats() for cache in (account_cache, payment_method_cache)}
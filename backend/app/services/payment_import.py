@@ -0,0 +1,183 @@
+"""Bulk import of historical payments (POST /payments/import).
+
+The upload (CSV with a header row, or NDJSON) is read from the request stream
+and parsed record by record, so the file is never held in memory. Each record
+is validated with PaymentCreate and against the account and payment method ids,
+loaded once up front. Valid rows are inserted IMPORT_BATCH_SIZE at a time, each
+batch with its rollup changes in one transaction; invalid rows are skipped and
+reported by row number (the CSV header is row 1). With `dry_run` nothing is
+written.
+"""
+import codecs
+import csv
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, Literal
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+
+from ..database import SessionLocal
+from ..models.account import Account
+from ..models.payment import Payment
+from ..models.payment_method import PaymentMethod
+from ..schemas.payment import PaymentCreate
+from .rollups import RollupChanges
+
+ImportFormat = Literal["csv", "ndjson"]
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+class InvalidEncoding(Exception):
+    pass
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decoded lines of the upload, each with its line break."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()  # Excel adds a BOM
+    pending = ""
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line + "\n"
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise InvalidEncoding
+    if pending:
+        yield pending
+
+
+async def _csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    header = None
+    line_number = 0
+    record, start = "", 0
+    async for line in _lines(chunks):
+        line_number += 1
+        if not record:
+            start = line_number
+        record += line
+        if record.count('"') % 2:  # a quoted field goes on in the next line
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+        elif len(values) != len(header):
+            yield start, None, f"Se esperaban {len(header)} columnas, hay {len(values)}"
+        else:
+            # Empty cells are missing values
+            yield start, {name: value for name, value in zip(header, values) if value != ""}, None
+    if record.strip():
+        yield start, None, "Comillas sin cerrar"
+
+
+async def _ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    line_number = 0
+    async for line in _lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield line_number, None, "JSON inválido"
+            continue
+        if isinstance(data, dict):
+            yield line_number, data, None
+        else:
+            yield line_number, None, "Se esperaba un objeto JSON"
+
+
+def records(chunks: AsyncIterator[bytes], format: ImportFormat):
+    """(row number, data, parse error) for every record of the upload."""
+    return _csv_records(chunks) if format == "csv" else _ndjson_records(chunks)
+
+
+def _errors(exc: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in exc.errors()
+    ]
+
+
+class PaymentImport:
+    """Validates records and writes the valid ones in batches. The database
+    methods are blocking; the endpoint runs them in the threadpool."""
+
+    def __init__(self, dry_run: bool):
+        self.dry_run = dry_run
+        self.account_ids: set[int] = set()
+        self.payment_method_ids: set[int] = set()
+        self.pending: list[dict] = []
+        self.rows = self.valid = self.invalid = self.imported = 0
+        self.errors: list[dict] = []
+
+    def load_ids(self):
+        with SessionLocal() as db:
+            self.account_ids = set(db.scalars(select(Account.id)))
+            self.payment_method_ids = set(db.scalars(select(PaymentMethod.id)))
+
+    def reject(self, row: int, errors: list[str]):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def add(self, row: int, data: dict | None, error: str | None):
+        self.rows += 1
+        if error:
+            self.reject(row, [error])
+            return
+        try:
+            payment = PaymentCreate.model_validate(data)
+        except ValidationError as exc:
+            self.reject(row, _errors(exc))
+            return
+        errors = []
+        if payment.account_id not in self.account_ids:
+            errors.append("Cuenta no encontrada")
+        if payment.payment_method_id is not None and payment.payment_method_id not in self.payment_method_ids:
+            errors.append("Medio de pago no encontrado")
+        if errors:
+            self.reject(row, errors)
+            return
+        paid_at = payment.paid_at or datetime.now(timezone.utc)
+        if paid_at.tzinfo is not None:
+            paid_at = paid_at.astimezone(timezone.utc)
+        self.valid += 1
+        self.pending.append({**payment.model_dump(), "paid_at": paid_at, "status": "completed"})
+
+    @property
+    def batch_full(self) -> bool:
+        return len(self.pending) >= IMPORT_BATCH_SIZE
+
+    def flush(self):
+        """Insert the pending rows and their rollups in one transaction."""
+        rows, self.pending = self.pending, []
+        if self.dry_run or not rows:
+            return
+        rollups = RollupChanges()
+        for row in rows:
+            rollups.payment(row["account_id"], row["payment_method_id"], row["paid_at"],
+                            row["amount"], row["status"], None)
+        with SessionLocal() as db:
+            db.execute(insert(Payment), rows)
+            rollups.apply(db)
+            db.commit()
+        self.imported += len(rows)
+
+    def report(self) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "rows": self.rows,
+            "valid": self.valid,
+            "invalid": self.invalid,
+            "imported": self.imported,
+            "errors": self.errors,
+            "errors_truncated": self.invalid > len(self.errors),
+        }
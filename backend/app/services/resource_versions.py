@@ -0,0 +1,54 @@
+"""Per-table change counters (`resource_versions`), behind the ETags of the read
+endpoints (utils/etag.py).
+
+Every transaction that writes one of VERSIONED_TABLES bumps its counter in the
+same transaction, from Session events: the ORM unit of work (after_flush) and
+bulk statements run through Session.execute (do_orm_execute, e.g. the bill
+upserts of a sync). Routers and task functions don't call anything; writes made
+outside a Session (raw connections) are not counted.
+"""
+from itertools import chain
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from ..models.resource_version import ResourceVersion
+
+VERSIONED_TABLES = ("accounts", "bills", "payments", "payment_methods")
+
+
+def versions_query(resources: tuple[str, ...]):
+    return select(ResourceVersion.resource, ResourceVersion.version).where(ResourceVersion.resource.in_(resources))
+
+
+def current_versions(db: Session, resources: tuple[str, ...]) -> dict[str, int]:
+    """Counter of each resource (0 if never written)."""
+    found = dict(db.execute(versions_query(resources)).all())
+    return {resource: found.get(resource, 0) for resource in resources}
+
+
+def _bump(session: Session, resources: set[str]):
+    table = ResourceVersion.__table__
+    statement = insert(table).values([{"resource": resource, "version": 1} for resource in sorted(resources)])
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.resource], set_={"version": table.c.version + 1}
+    )
+    session.connection().execute(statement)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed(session: Session, flush_context):
+    changed = chain(session.new, session.deleted, (obj for obj in session.dirty if session.is_modified(obj)))
+    resources = {obj.__table__.name for obj in changed} & set(VERSIONED_TABLES)
+    if resources:
+        _bump(session, resources)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_bulk(state: ORMExecuteState):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    name = getattr(state.statement.table, "name", None)
+    if name in VERSIONED_TABLES:
+        _bump(state.session, {name})
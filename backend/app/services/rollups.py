@@ -0,0 +1,153 @@
+"""Monthly spending rollups (`spending_rollups`), read by GET /stats.
+
+The table is maintained incrementally: every write path that adds or removes
+a completed payment, or adds, changes or pays an unpaid bill, records the
+difference in a RollupChanges and applies it in the same transaction before
+committing. `rebuild` recomputes the whole table from payments and bills.
+
+- Payments count by (account, payment method, month of paid_at, currency of
+  their bill, else DEFAULT_CURRENCY). Only status "completed" counts.
+- Unpaid bills count as dues by (account, month of due_date, currency), under
+  NO_PAYMENT_METHOD.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Integer, cast, delete, func, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from ..models.bill import Bill
+from ..models.payment import Payment
+from ..models.spending_rollup import NO_PAYMENT_METHOD, SpendingRollup
+
+DEFAULT_CURRENCY = "ARS"
+
+_MEASURES = ("paid_cents", "payment_count", "due_cents", "due_count")
+
+
+def to_cents(amount) -> int:
+    return int((Decimal(str(amount)) * 100).quantize(Decimal(1)))
+
+
+class RollupChanges:
+    """Accumulates rollup deltas; `apply` upserts them with one statement."""
+
+    def __init__(self):
+        self._deltas: dict[tuple, list[int]] = defaultdict(lambda: [0, 0, 0, 0])
+
+    def payment(self, account_id: int, payment_method_id: int | None, paid_at: date | None,
+                amount, status: str | None, currency: str | None, sign: int = 1):
+        if status != "completed" or paid_at is None:
+            return
+        key = (account_id, payment_method_id or NO_PAYMENT_METHOD, paid_at.strftime("%Y-%m"),
+               currency or DEFAULT_CURRENCY)
+        delta = self._deltas[key]
+        delta[0] += sign * to_cents(amount)
+        delta[1] += sign
+
+    def unpaid_bill(self, account_id: int, due_date: date, currency: str | None,
+                    amount_cents: int, status: str | None, sign: int = 1):
+        if status != "UNPAID":
+            return
+        key = (account_id, NO_PAYMENT_METHOD, due_date.strftime("%Y-%m"), currency or DEFAULT_CURRENCY)
+        delta = self._deltas[key]
+        delta[2] += sign * amount_cents
+        delta[3] += sign
+
+    def apply(self, db: Session):
+        """Add the accumulated deltas to the table. Does not commit."""
+        rows = [
+            {
+                "account_id": account_id,
+                "payment_method_id": payment_method_id,
+                "month": month,
+                "currency": currency,
+                **dict(zip(_MEASURES, delta)),
+            }
+            for (account_id, payment_method_id, month, currency), delta in self._deltas.items()
+            if any(delta)
+        ]
+        self._deltas.clear()
+        if not rows:
+            return
+        table = SpendingRollup.__table__
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.account_id, table.c.payment_method_id, table.c.month, table.c.currency],
+            set_={name: table.c[name] + statement.excluded[name] for name in _MEASURES},
+        )
+        db.execute(statement, rows)
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every rollup from payments and bills. Returns the rows written; does not commit."""
+    payments = (
+        select(
+            Payment.account_id,
+            func.coalesce(Payment.payment_method_id, NO_PAYMENT_METHOD).label("payment_method_id"),
+            func.strftime("%Y-%m", Payment.paid_at).label("month"),
+            func.coalesce(Bill.currency, DEFAULT_CURRENCY).label("currency"),
+            cast(func.round(Payment.amount * 100), Integer).label("paid_cents"),
+            literal(1).label("payment_count"),
+            literal(0).label("due_cents"),
+            literal(0).label("due_count"),
+        )
+        .outerjoin(Bill, Bill.id == Payment.bill_id)
+        .where(Payment.status == "completed", Payment.paid_at.is_not(None))
+    )
+    dues = (
+        select(
+            Bill.account_id,
+            literal(NO_PAYMENT_METHOD),
+            func.strftime("%Y-%m", Bill.due_date),
+            func.coalesce(Bill.currency, DEFAULT_CURRENCY),
+            literal(0),
+            literal(0),
+            Bill.amount_cents,
+            literal(1),
+        )
+        .where(Bill.status == "UNPAID")
+    )
+    source = union_all(payments, dues).subquery()
+    keys = (source.c.account_id, source.c.payment_method_id, source.c.month, source.c.currency)
+    totals = select(*keys, *(func.sum(source.c[name]).label(name) for name in _MEASURES)).group_by(*keys)
+
+    db.execute(delete(SpendingRollup))
+    columns = ["account_id", "payment_method_id", "month", "currency", *_MEASURES]
+    result = db.execute(insert(SpendingRollup.__table__).from_select(columns, totals))
+    return result.rowcount
+
+
+def stats(db: Session, from_month: str | None = None, to_month: str | None = None,
+          account_id: int | None = None, current_month: str | None = None) -> dict:
+    """Totals for GET /stats, read only from `spending_rollups`."""
+    filters = []
+    if from_month:
+        filters.append(SpendingRollup.month >= from_month)
+    if to_month:
+        filters.append(SpendingRollup.month <= to_month)
+    if account_id is not None:
+        filters.append(SpendingRollup.account_id == account_id)
+
+    paid = (func.sum(SpendingRollup.paid_cents).label("paid_cents"),
+            func.sum(SpendingRollup.payment_count).label("payment_count"))
+    due = (func.sum(SpendingRollup.due_cents).label("due_cents"),
+           func.sum(SpendingRollup.due_count).label("due_count"))
+
+    def grouped(keys, measures, *where):
+        query = select(*keys, *measures).where(*filters, *where).group_by(*keys).order_by(*keys)
+        return [dict(row._mapping) for row in db.execute(query)]
+
+    has_payments = SpendingRollup.payment_count != 0
+    has_dues = SpendingRollup.due_count != 0
+    overdue = SpendingRollup.month < (current_month or date.today().strftime("%Y-%m"))
+    month, currency = SpendingRollup.month, SpendingRollup.currency
+    return {
+        "by_account": grouped((month, SpendingRollup.account_id, currency), paid, has_payments),
+        "by_payment_method": grouped((month, SpendingRollup.payment_method_id, currency), paid, has_payments),
+        "by_currency": grouped((month, currency), paid, has_payments),
+        "upcoming_dues": grouped((month, currency), due, has_dues, ~overdue),
+        "overdue": grouped((currency,), due, has_dues, overdue),
+    }
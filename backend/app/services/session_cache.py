@@ -0,0 +1,56 @@
+"""Encrypted cache of authenticated driver browser sessions.
+
+Drivers return their Playwright `storage_state` after a successful run; the
+next job for the same account gets it back and can skip the login (and its
+reCAPTCHA) while the session is still valid. States are stored Fernet-encrypted
+with CARD_ENCRYPTION_KEY and expire after DRIVER_SESSION_TTL seconds. Without
+a key configured nothing is cached.
+"""
+from datetime import datetime, timedelta, timezone
+
+from cryptography.fernet import InvalidToken
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models.driver_session import DriverSession
+from .encryption import decrypt_json, encrypt_json
+
+
+def enabled() -> bool:
+    return bool(get_settings().card_encryption_key)
+
+
+def load_session(account_id: int) -> dict | None:
+    if not enabled():
+        return None
+    with SessionLocal() as db:
+        cached = db.query(DriverSession).filter(
+            DriverSession.account_id == account_id,
+            DriverSession.expires_at > datetime.now(timezone.utc),
+        ).first()
+        if not cached:
+            return None
+        try:
+            return decrypt_json(cached.encrypted_state)
+        except InvalidToken:
+            return None
+
+
+def save_session(account_id: int, state: dict):
+    if not enabled():
+        return
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=get_settings().driver_session_ttl)
+    with SessionLocal() as db:
+        cached = db.get(DriverSession, account_id)
+        if cached is None:
+            cached = DriverSession(account_id=account_id)
+            db.add(cached)
+        cached.encrypted_state = encrypt_json(state)
+        cached.expires_at = expires_at
+        db.commit()
+
+
+def clear_session(account_id: int):
+    with SessionLocal() as db:
+        db.query(DriverSession).filter(DriverSession.account_id == account_id).delete()
+        db.commit()
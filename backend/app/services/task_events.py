@@ -0,0 +1,102 @@
+"""In-process notifications of task changes, for `GET /tasks/{id}/events`.
+
+Every ORM flush that creates or changes a Task publishes a snapshot of it once
+the transaction commits; subscribers (SSE streams, on the event loop) receive
+them without re-reading the database. Changes made with Core statements (the
+executor's claim) are published explicitly with `publish_task`.
+
+Notifications don't cross processes: tasks run by a standalone `app.worker`
+are only seen by the API's periodic fallback check.
+"""
+import asyncio
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..models.task import Task
+from ..schemas.task import TaskResponse
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+def task_snapshot(task: Task) -> dict:
+    # Without `result`, which is deferred: as GET /tasks/{id} without ?include=result
+    return TaskResponse.from_task(task).model_dump(mode="json")
+
+
+class _Subscription:
+    def __init__(self, bus: "TaskEventBus", task_id: str):
+        self.bus = bus
+        self.task_id = task_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+    def close(self):
+        self.bus._unsubscribe(self)
+
+
+class TaskEventBus:
+    def __init__(self):
+        self._subscribers: dict[str, set[_Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, task_id: str) -> _Subscription:
+        """Must be called from the event loop that will consume the events."""
+        subscription = _Subscription(self, task_id)
+        with self._lock:
+            self._subscribers.setdefault(task_id, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: _Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.task_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.task_id]
+
+    def publish(self, task_id: str, message: dict):
+        """Thread-safe; cheap when nobody is listening."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(task_id, ()))
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(subscription.queue.put_nowait, message)
+
+
+task_event_bus = TaskEventBus()
+
+
+def publish_task(task: Task):
+    task_event_bus.publish(task.id, {"type": "task", "task": task_snapshot(task)})
+    if task.parent_id:
+        task_event_bus.publish(task.parent_id, {"type": "child", "task_id": task.id})
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_task_changes(session: Session, flush_context):
+    changed = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Task) and (obj in session.new or session.is_modified(obj))
+    ]
+    if changed:
+        pending = session.info.setdefault("task_events", {})
+        for task in changed:
+            pending[task.id] = (task.parent_id, task_snapshot(task))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_task_changes(session: Session):
+    pending = session.info.pop("task_events", None)
+    for task_id, (parent_id, snapshot) in (pending or {}).items():
+        task_event_bus.publish(task_id, {"type": "task", "task": snapshot})
+        if parent_id:
+            task_event_bus.publish(parent_id, {"type": "child", "task_id": task_id})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_task_changes(session: Session):
+    session.info.pop("task_events", None)
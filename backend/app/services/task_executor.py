@@ -0,0 +1,374 @@
+"""Durable executor for background driver tasks.
+
+Tasks are rows in the `tasks` table. Any number of processes (the API with its
+embedded executor, or standalone `python -m app.worker`) claim pending rows
+with an atomic status transition and hold a lease on them, renewed by a
+heartbeat while the driver runs. A task whose lease expires (the process died
+or hung) goes back to the queue.
+
+Concurrency is capped per process (`TASK_MAX_CONCURRENCY` threads) and per
+driver across all processes (`TASK_MAX_PER_DRIVER`). Queued tasks run by
+priority: payments before syncs.
+
+Bulk operations create a parent task (e.g. `sync_all`) that is never claimed
+itself; it finishes when the last of its child tasks does.
+
+Every TASK_PRUNE_INTERVAL seconds each executor also applies the retention
+policy (services/task_retention.py); concurrent runs are harmless.
+"""
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models.task import Task
+from . import resource_versions  # noqa: F401  (session listeners: writes of task functions bump ETags)
+from .task_events import publish_task
+from .task_retention import prune_tasks
+
+PRIORITIES = {"pay": 0, "pay_bills": 0, "sync": 1, "backfill": 2}
+DEFAULT_PRIORITY = 3
+
+# Tasks that only aggregate their children (see finish_parent)
+PARENT_TYPES = {"sync_all", "pay_all"}
+
+# Tasks that must never run twice: an interrupted payment is failed, not retried
+NOT_RETRIABLE = {"pay", "pay_bills"}
+
+
+def new_task(task_type: str, account_id: int | None, driver_name: str | None, **fields) -> Task:
+    """Build a pending Task row ready to be claimed by an executor."""
+    return Task(
+        id=str(uuid.uuid4()),
+        type=task_type,
+        status="pending",
+        priority=PRIORITIES.get(task_type, DEFAULT_PRIORITY),
+        account_id=account_id,
+        driver_name=driver_name,
+        created_at=datetime.now(timezone.utc),
+        **fields,
+    )
+
+
+def queue_position(db: Session, task: Task, max_per_driver: int | None = None) -> int:
+    """1-based position of a pending task in the claim order.
+
+    Claims go by priority, skipping drivers at their TASK_MAX_PER_DRIVER cap.
+    A task whose driver has a free slot by its turn comes after the tasks
+    ahead of it that can start too: all of its own driver's, and those of
+    other drivers up to their free slots. A task whose driver will be full
+    comes after everything that can start now, plus its driver's queue. Exact
+    until a running task finishes.
+    """
+    if max_per_driver is None:
+        max_per_driver = get_settings().task_max_per_driver
+    is_ahead = or_(
+        Task.priority < task.priority,
+        and_(Task.priority == task.priority, Task.created_at < task.created_at),
+    )
+    pending = {
+        driver_name: (total, ahead or 0)
+        for driver_name, total, ahead in db.query(
+            Task.driver_name, func.count(Task.id), func.sum(case((is_ahead, 1), else_=0))
+        ).filter(Task.status == "pending").group_by(Task.driver_name)
+    }
+    running = dict(
+        db.query(Task.driver_name, func.count(Task.id))
+        .filter(Task.status == "running", Task.lease_expires_at >= datetime.now(timezone.utc))
+        .group_by(Task.driver_name)
+    )
+
+    def free(driver_name) -> float:
+        if driver_name is None:
+            return float("inf")
+        return max(max_per_driver - running.get(driver_name, 0), 0)
+
+    own_ahead = pending.get(task.driver_name, (0, 0))[1]
+    if own_ahead < free(task.driver_name):
+        others = sum(
+            min(ahead, free(driver_name))
+            for driver_name, (_, ahead) in pending.items() if driver_name != task.driver_name
+        )
+        return own_ahead + others + 1
+    startable = sum(min(total, free(driver_name)) for driver_name, (total, _) in pending.items())
+    return startable + own_ahead - free(task.driver_name) + 1
+
+
+def child_counts(db: Session, parent_id: str) -> dict:
+    """Aggregate progress of a parent task: total/done/failed children."""
+    counts = dict(
+        db.query(Task.status, func.count(Task.id))
+        .filter(Task.parent_id == parent_id)
+        .group_by(Task.status)
+        .all()
+    )
+    return {
+        "total": sum(counts.values()),
+        "done": counts.get("completed", 0),
+        "failed": counts.get("failed", 0),
+    }
+
+
+def finish_parent(db: Session, parent_id: str):
+    """Close a parent task once none of its children is pending or running.
+
+    Idempotent: whichever child finishes last sees every sibling terminal.
+    """
+    progress = child_counts(db, parent_id)
+    if progress["done"] + progress["failed"] < progress["total"]:
+        return
+    parent = db.query(Task).filter(Task.id == parent_id, Task.status == "running").first()
+    if not parent:
+        return
+    parent.result = progress
+    if progress["failed"]:
+        parent.error = f"{progress['failed']} de {progress['total']} tareas fallaron"
+    parent.status = "failed" if progress["total"] and progress["failed"] == progress["total"] else "completed"
+    parent.finished_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def _lease_expired(now: datetime):
+    return or_(Task.lease_expires_at.is_(None), Task.lease_expires_at < now)
+
+
+def _handlers() -> dict[str, Callable]:
+    from ..routers.bills import _run_sync_task, _run_pay_task, _run_pay_bills_task, _run_backfill_task
+    return {
+        "sync": lambda task: _run_sync_task(task.id, task.account_id),
+        "pay": lambda task: _run_pay_task(task.id, task.bill_id, task.payment_method_id),
+        "pay_bills": lambda task: _run_pay_bills_task(task.id, task.bill_ids, task.payment_method_id),
+        "backfill": lambda task: _run_backfill_task(task.id, task.account_id),
+    }
+
+
+class TaskExecutor:
+    def __init__(self, worker_id: str, concurrency: int, max_per_driver: int,
+                 lease_seconds: int, poll_interval: float, max_attempts: int,
+                 prune_interval: float = 0):
+        self.worker_id = worker_id
+        self.concurrency = max(concurrency, 1)
+        self.max_per_driver = max(max_per_driver, 1)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.prune_interval = prune_interval
+        self._wake = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._current: set[str] = set()
+        self._current_lock = threading.Lock()
+
+    def start(self):
+        if self._threads:
+            return
+        self._stopping.clear()
+        for _ in range(self.concurrency):
+            self._threads.append(threading.Thread(target=self._work, daemon=True))
+        self._threads.append(threading.Thread(target=self._heartbeat, daemon=True))
+        if self.prune_interval > 0:
+            self._threads.append(threading.Thread(target=self._prune, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float | None = None):
+        """Stop claiming new tasks and wait for the running ones to finish."""
+        self._stopping.set()
+        self.notify()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """Wake idle threads right away instead of waiting for the next poll."""
+        with self._wake:
+            self._wake.notify_all()
+
+    def _fail_abandoned(self, db: Session, now: datetime):
+        abandoned = and_(
+            Task.type.in_(list(_handlers())),
+            Task.status == "running",
+            _lease_expired(now),
+            or_(Task.type.in_(NOT_RETRIABLE), Task.attempts >= self.max_attempts),
+        )
+        task_ids = db.scalars(select(Task.id).where(abandoned)).all()
+        if not task_ids:
+            return
+        db.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids), abandoned)
+            .values(
+                status="failed",
+                error="La tarea fue interrumpida (el worker dejó de responder)",
+                finished_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        parent_ids = set()
+        for task in db.query(Task).filter(Task.id.in_(task_ids)):
+            publish_task(task)
+            if task.parent_id:
+                parent_ids.add(task.parent_id)
+        for parent_id in parent_ids:
+            finish_parent(db, parent_id)
+
+    def claim(self) -> Task | None:
+        """Atomically move the next runnable task to `running` under our lease."""
+        now = datetime.now(timezone.utc)
+        claimable = and_(
+            Task.type.in_(list(_handlers())),
+            or_(
+                Task.status == "pending",
+                and_(
+                    Task.status == "running",
+                    _lease_expired(now),
+                    Task.type.not_in(NOT_RETRIABLE),
+                    Task.attempts < self.max_attempts,
+                ),
+            ),
+        )
+        other = aliased(Task)
+        running_for_driver = (
+            select(func.count(other.id))
+            .where(
+                other.driver_name == Task.driver_name,
+                other.status == "running",
+                other.lease_expires_at >= now,
+            )
+            .scalar_subquery()
+        )
+        # Drivers already at their cap are left out before the LIMIT, so one
+        # driver's backlog can't fill the window and starve the others
+        busy_drivers = (
+            select(other.driver_name)
+            .where(other.status == "running", other.lease_expires_at >= now, other.driver_name.is_not(None))
+            .group_by(other.driver_name)
+            .having(func.count(other.id) >= self.max_per_driver)
+        )
+
+        with SessionLocal() as db:
+            self._fail_abandoned(db, now)
+
+            candidates = db.scalars(
+                select(Task.id)
+                .where(claimable, or_(Task.driver_name.is_(None), Task.driver_name.not_in(busy_drivers)))
+                .order_by(Task.priority, Task.created_at)
+                .limit(self.concurrency * 4)
+            ).all()
+
+            for task_id in candidates:
+                claimed = db.execute(
+                    update(Task)
+                    .where(
+                        Task.id == task_id,
+                        claimable,
+                        or_(Task.driver_name.is_(None), running_for_driver < self.max_per_driver),
+                    )
+                    .values(
+                        status="running",
+                        worker_id=self.worker_id,
+                        heartbeat_at=now,
+                        lease_expires_at=now + self.lease,
+                        attempts=Task.attempts + 1,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                if claimed.rowcount == 1:
+                    task = db.get(Task, task_id)
+                    db.expunge(task)
+                    publish_task(task)
+                    return task
+        return None
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                task = self.claim()
+            except Exception:
+                task = None  # e.g. database locked; retry on the next poll
+
+            if task is None:
+                with self._wake:
+                    self._wake.wait(self.poll_interval)
+                continue
+
+            with self._current_lock:
+                self._current.add(task.id)
+            try:
+                _handlers()[task.type](task)
+            except Exception:
+                pass  # task functions record their own failures
+            finally:
+                with self._current_lock:
+                    self._current.discard(task.id)
+
+            try:
+                with SessionLocal() as db:
+                    # Re-read: a bulk sync may have adopted the task while it ran
+                    parent_id = db.scalar(select(Task.parent_id).where(Task.id == task.id))
+                    if parent_id:
+                        finish_parent(db, parent_id)
+            except Exception:
+                pass  # _fail_abandoned or a sibling closes the parent later
+
+    def _heartbeat(self):
+        interval = self.lease.total_seconds() / 3
+        while not self._stopping.wait(interval):
+            with self._current_lock:
+                task_ids = list(self._current)
+            if not task_ids:
+                continue
+            now = datetime.now(timezone.utc)
+            try:
+                with SessionLocal() as db:
+                    db.execute(
+                        update(Task)
+                        .where(
+                            Task.id.in_(task_ids),
+                            Task.worker_id == self.worker_id,
+                            Task.status == "running",
+                        )
+                        .values(heartbeat_at=now, lease_expires_at=now + self.lease)
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.commit()
+            except Exception:
+                pass  # the next beat retries well before the lease runs out
+
+    def _prune(self):
+        while not self._stopping.wait(self.prune_interval):
+            try:
+                with SessionLocal() as db:
+                    prune_tasks(db)
+            except Exception:
+                pass  # e.g. database locked; the next run catches up
+
+
+def make_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def build_executor(concurrency: int | None = None) -> TaskExecutor:
+    settings = get_settings()
+    return TaskExecutor(
+        worker_id=make_worker_id(),
+        concurrency=concurrency or settings.task_max_concurrency,
+        max_per_driver=settings.task_max_per_driver,
+        lease_seconds=settings.task_lease_seconds,
+        poll_interval=settings.task_poll_interval,
+        max_attempts=settings.task_max_attempts,
+        prune_interval=settings.task_prune_interval,
+    )
+
+
+# Executor embedded in the API process (see TASK_EMBEDDED_WORKER)
+task_executor = build_executor()
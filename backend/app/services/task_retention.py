@@ -0,0 +1,111 @@
+"""Retention for the `tasks` table, run periodically by the executors
+(TASK_PRUNE_INTERVAL) and on demand with `python -m app.cli prune-tasks`.
+
+- Finished tasks older than TASK_RETENTION_DAYS are deleted, except the latest
+  TASK_RETENTION_PER_ACCOUNT tasks of each account (parent tasks, which have no
+  account, count as one group).
+- Finished tasks older than TASK_RESULT_COMPACT_DAYS lose the COMPACTED_KEYS of
+  their `result`: the bulky driver payload (every bill a sync returned, already
+  stored in `bills`) goes, the summary and errors stay.
+
+Both steps work in batches of PRUNE_BATCH_SIZE rows, one short transaction
+each, so a large backlog never holds SQLite's write lock for long.
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Select, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models.task import Task
+from .task_events import TERMINAL_STATUSES
+
+PRUNE_BATCH_SIZE = 500
+
+COMPACTED_KEYS = ("bills",)
+
+
+def compact_result(result):
+    if not isinstance(result, dict):
+        return result
+    return {key: value for key, value in result.items() if key not in COMPACTED_KEYS}
+
+
+def expired_tasks(cutoff: datetime, keep_per_account: int) -> Select:
+    """Ids of finished tasks older than `cutoff` beyond the latest `keep_per_account` of their account."""
+    ranked = select(
+        Task.id,
+        Task.status,
+        Task.created_at,
+        func.row_number().over(
+            partition_by=Task.account_id, order_by=(Task.created_at.desc(), Task.id.desc())
+        ).label("rank"),
+    ).subquery()
+    return select(ranked.c.id).where(
+        ranked.c.rank > keep_per_account,
+        ranked.c.status.in_(TERMINAL_STATUSES),
+        ranked.c.created_at < cutoff,
+    )
+
+
+def delete_expired(db: Session, cutoff: datetime, keep_per_account: int) -> int:
+    deleted = 0
+    while True:
+        task_ids = db.scalars(expired_tasks(cutoff, keep_per_account).limit(PRUNE_BATCH_SIZE)).all()
+        if not task_ids:
+            return deleted
+        # Children kept by the per-account rule outlive their parent
+        db.execute(
+            update(Task).where(Task.parent_id.in_(task_ids)).values(parent_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        deleted += db.execute(
+            delete(Task).where(Task.id.in_(task_ids)).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+
+
+def compact_results(db: Session, cutoff: datetime) -> int:
+    # Only results still holding a compacted key, so every cycle doesn't
+    # re-read (and rewrite) the rows compacted by the previous ones
+    uncompacted = or_(*(func.json_type(Task.result, f"$.{key}").is_not(None) for key in COMPACTED_KEYS))
+    compacted = 0
+    last_id = ""
+    while True:
+        rows = db.execute(
+            select(Task.id, Task.result)
+            .where(
+                Task.status.in_(TERMINAL_STATUSES),
+                Task.created_at < cutoff,
+                uncompacted,
+                Task.id > last_id,
+            )
+            .order_by(Task.id)
+            .limit(PRUNE_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return compacted
+        last_id = rows[-1].id
+        changes = []
+        for row in rows:
+            result = compact_result(row.result)
+            if result != row.result:
+                changes.append({"id": row.id, "result": result})
+        if changes:
+            db.execute(update(Task), changes)  # bulk UPDATE by primary key
+            db.commit()
+            compacted += len(changes)
+
+
+def prune_tasks(db: Session, now: datetime | None = None) -> dict:
+    """Apply the retention policy. Commits per batch; returns the rows deleted and compacted."""
+    settings = get_settings()
+    now = now or datetime.now(timezone.utc)
+    deleted = compacted = 0
+    if settings.task_retention_days > 0:
+        deleted = delete_expired(
+            db, now - timedelta(days=settings.task_retention_days), settings.task_retention_per_account
+        )
+    if settings.task_result_compact_days > 0:
+        compacted = compact_results(db, now - timedelta(days=settings.task_result_compact_days))
+    return {"deleted": deleted, "compacted": compacted}
@@ -0,0 +1,59 @@
+"""Per-driver task counts and durations for GET /stats/tasks.
+
+SQLite has no percentile function: durations are ranked per driver with a
+window and the nearest-rank percentile (rank = ceil(p * n)) is picked in SQL,
+so no rows are loaded into Python.
+"""
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from ..models.task import Task
+from .task_events import TERMINAL_STATUSES
+
+PERCENTILES = (50, 95)
+
+
+def _duration_seconds():
+    return (func.julianday(Task.finished_at) - func.julianday(Task.created_at)) * 86400
+
+
+def task_stats(db: Session, filters: list) -> list[dict]:
+    drivers: dict = {}
+    counts = db.execute(
+        select(Task.driver_name, Task.status, func.count(Task.id))
+        .where(*filters)
+        .group_by(Task.driver_name, Task.status)
+    )
+    for driver_name, status, count in counts:
+        entry = drivers.setdefault(driver_name, {"driver_name": driver_name, "total": 0, "by_status": {}})
+        entry["total"] += count
+        entry["by_status"][status] = count
+
+    seconds = _duration_seconds()
+    ranked = (
+        select(
+            Task.driver_name,
+            seconds.label("seconds"),
+            func.row_number().over(partition_by=Task.driver_name, order_by=seconds).label("rank"),
+            func.count().over(partition_by=Task.driver_name).label("n"),
+        )
+        .where(*filters, Task.status.in_(TERMINAL_STATUSES), Task.finished_at.is_not(None))
+        .subquery()
+    )
+    percentiles = db.execute(
+        select(
+            ranked.c.driver_name,
+            *(
+                func.max(case((ranked.c.rank == (ranked.c.n * p + 99) // 100, ranked.c.seconds))).label(f"p{p}")
+                for p in PERCENTILES
+            ),
+        ).group_by(ranked.c.driver_name)
+    )
+    for row in percentiles:
+        entry = drivers.get(row.driver_name)
+        if entry is not None:
+            for p in PERCENTILES:
+                value = getattr(row, f"p{p}")
+                entry[f"p{p}_seconds"] = round(value, 3) if value is not None else None
+
+    return sorted(drivers.values(), key=lambda entry: (entry["driver_name"] is None, entry["driver_name"] or ""))
@@ -0,0 +1,51 @@
+"""Conditional GET for read endpoints.
+
+The ETag of a response is made of the change counters of the tables it reads
+(services/resource_versions.py), so checking `If-None-Match` costs a primary
+key lookup. Used as a route dependency, it answers 304 before the endpoint
+runs its query:
+
+    @router.get("/", dependencies=[Depends(conditional("bills"))])
+"""
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database import get_async_db, get_db
+from ..services.resource_versions import current_versions
+
+
+def make_etag(versions: dict[str, int]) -> str:
+    return 'W/"' + ".".join(f"{resource}-{version}" for resource, version in versions.items()) + '"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" match
+    return etag.removeprefix("W/") in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def _check(request: Request, response: Response, etag: str):
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # cache, but revalidate every time
+    if _matches(request, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+def conditional(*resources: str):
+    """Route dependency: ETag of `resources`, 304 when the client already has it."""
+    def check(request: Request, response: Response, db: Session = Depends(get_db)):
+        _check(request, response, make_etag(current_versions(db, resources)))
+    return check
+
+
+def conditional_async(*resources: str):
+    """`conditional` for the async endpoints (routers/async_reads.py)."""
+    async def check(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+        versions = await db.run_sync(lambda session: current_versions(session, resources))
+        _check(request, response, make_etag(versions))
+    return check
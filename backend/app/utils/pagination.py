@@ -0,0 +1,131 @@
+"""Keyset pagination and NDJSON streaming for list endpoints.
+
+A page is requested with `limit` (and `cursor` for the following ones); when
+more rows exist the response carries an opaque `X-Next-Cursor` header encoding
+the sort key of the last row. The sort key must end in a unique column (id) and
+match the query's ORDER BY.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Iterator, Sequence
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from . import fast_json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+STREAM_BATCH_SIZE = 500
+
+
+def _encode_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _decode_value(column, value):
+    python_type = column.type.python_type
+    if python_type in (date, datetime):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([_encode_value(v) for v in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(columns):
+            raise ValueError
+        return [_decode_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def keyset_page(query: Select, columns: Sequence, cursor: str | None, limit: int,
+                descending: bool = True) -> Select:
+    """Restrict an ordered query to the page after `cursor` (one extra row to detect more)."""
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns)
+        query = query.where(key < tuple_(*values) if descending else key > tuple_(*values))
+    return query.limit(limit + 1)
+
+
+def finish_page(rows: Sequence, columns: Sequence, limit: int, response: Response) -> list:
+    """Drop the extra row and set X-Next-Cursor if there is a next page."""
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows
+
+
+def page_size(limit: int | None, cursor: str | None) -> int | None:
+    """None means the whole list (no `limit` nor `cursor`, the original behaviour)."""
+    if limit is None and cursor is None:
+        return None
+    return limit or DEFAULT_PAGE_SIZE
+
+
+def page_statement(query: Select, columns: Sequence, limit: int | None, cursor: str | None,
+                   descending: bool = True, schema: type[BaseModel] | None = None):
+    """The statement to run for a list request, and its page size (None: whole list).
+
+    With `schema` (fast path) the statement selects plain columns, not entities.
+    """
+    if schema is not None:
+        query = fast_json.schema_columns(query, schema)
+    size = page_size(limit, cursor)
+    if size is not None:
+        query = keyset_page(query, columns, cursor, size, descending)
+    return query, size
+
+
+def page_result(rows: Sequence, columns: Sequence, size: int | None, response: Response,
+                fast: bool = False):
+    if size is not None:
+        rows = finish_page(rows, columns, size, response)
+    if not fast:
+        return rows
+    # Returned as is, so carry over the headers set on `response` (cursor, ETag)
+    return fast_json.FastJSONResponse([row._asdict() for row in rows], headers=dict(response.headers))
+
+
+def paginate(db: Session, query: Select, columns: Sequence, limit: int | None,
+             cursor: str | None, response: Response, descending: bool = True,
+             schema: type[BaseModel] | None = None):
+    """Run a list request: ORM rows for FastAPI to validate, or with `schema` and
+    FAST_LIST_RESPONSES, an already encoded response."""
+    fast = fast_json.enabled(schema)
+    statement, size = page_statement(query, columns, limit, cursor, descending, schema if fast else None)
+    result = db.execute(statement)
+    rows = result.all() if fast else result.scalars().all()
+    return page_result(rows, columns, size, response, fast)
+
+
+def ndjson_response(query: Select, schema: type[BaseModel]) -> StreamingResponse:
+    """Stream every row of `query` as one JSON object per line, in constant memory."""
+    def rows() -> Iterator[bytes]:
+        with SessionLocal() as db:
+            if fast_json.enabled(schema):
+                statement = fast_json.schema_columns(query, schema)
+                for row in db.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE)):
+                    yield fast_json.dumps(row._asdict()) + b"\n"
+                return
+            for row in db.scalars(query.execution_options(yield_per=STREAM_BATCH_SIZE)):
+                yield schema.model_validate(row).model_dump_json().encode() + b"\n"
+                db.expunge(row)
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
@@ -0,0 +1,35 @@
+"""Standalone task worker.
+
+Claims tasks from the `tasks` table and runs their drivers, so task execution
+can scale independently of the API (e.g. `uvicorn --workers N` with
+`TASK_EMBEDDED_WORKER=false`):
+
+    uv run python -m app.worker --concurrency 2
+"""
+import argparse
+import signal
+import threading
+
+from .services.task_executor import build_executor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cuentas App task worker")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Tasks to run at once (default: TASK_MAX_CONCURRENCY)")
+    args = parser.parse_args()
+
+    executor = build_executor(args.concurrency)
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    print(f"Worker {executor.worker_id} iniciado ({executor.concurrency} tareas en paralelo)")
+    executor.start()
+    stop.wait()
+    print("Deteniendo worker, esperando tareas en curso...")
+    executor.stop()
+
+
+if __name__ == "__main__":
+    main()
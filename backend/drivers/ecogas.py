@@ -13,11 +13,18 @@ import sys
 import json
 import os
 import re
+from contextlib import contextmanager
 
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from playwright_recaptcha import recaptchav2
 
 URL = "https://autogestion.ecogas.com.ar/uiextranet/ingreso"
+VIEWPORT = {"width": 1280, "height": 720}
+PROTOCOL_VERSION = 1
+STREAM_BATCH_SIZE = 50
+
+# Id of the worker job being served, so streamed events can be framed with it
+current_request_id = None
 
 
 def log(msg):
@@ -25,16 +32,40 @@ def log(msg):
 
 
 def output(result):
-    print(json.dumps(result))
+    print(json.dumps(result), flush=True)
 
 
-def require_env(*names):
+def emit(event):
+    """Stream an intermediate event if the backend asked for it (DRIVER_STREAM=1)."""
+    if not os.environ.get("DRIVER_STREAM"):
+        return False
+    if current_request_id is not None:
+        output({"id": current_request_id, "event": event})
+    else:
+        output(event)
+    return True
+
+
+def progress(message):
+    """Log a step and report it to the backend while streaming."""
+    log(f"[*] {message}")
+    emit({"type": "progress", "message": message})
+
+
+def missing_env(*names):
+    """Return an error result if any of the variables is missing, else None."""
     missing = [n for n in names if not os.environ.get(n)]
     if missing:
-        result = {
+        return {
             "errors": [f"Faltan variables de entorno requeridas: {', '.join(missing)}"],
             "bills": [],
         }
+    return None
+
+
+def require_env(*names):
+    result = missing_env(*names)
+    if result:
         output(result)
         sys.exit(1)
 
@@ -50,12 +81,37 @@ def parse_amount_cents(text):
         return 0
 
 
-def login(page):
+def new_context(browser):
+    """Browser context restoring the session cached by the backend, if any.
+
+    Returns (context, restored). A cached state that can't be loaded (corrupt,
+    or written by another browser version) falls back to a clean context.
+    """
+    state = os.environ.get("DRIVER_SESSION_STATE")
+    if state:
+        try:
+            return browser.new_context(viewport=VIEWPORT, storage_state=json.loads(state)), True
+        except Exception as e:
+            log(f"[*] No se pudo restaurar la sesión guardada ({e}), ingresando de nuevo...")
+    return browser.new_context(viewport=VIEWPORT), False
+
+
+def login(page, restored=False):
     """Navigate to Ecogas and log in with the account number. Returns the page on the dashboard."""
     numero_cuenta = os.environ["NUMERO_CUENTA"]
 
-    log(f"[*] Navigando a {URL}...")
+    progress("Abriendo el sitio de Ecogas")
     page.goto(URL, wait_until="domcontentloaded", timeout=60000)
+
+    # With a restored session the site goes straight to the dashboard
+    if restored:
+        try:
+            page.wait_for_selector("text=Panel de Control", timeout=5000)
+            progress("Sesión reutilizada")
+            return
+        except PlaywrightTimeoutError:
+            log("[*] La sesión guardada expiró, ingresando de nuevo...")
+
     page.wait_for_selector("#cliente", timeout=15000)
     page.wait_for_timeout(3000)
 
@@ -63,10 +119,11 @@ def login(page):
     page.fill("#cliente", numero_cuenta)
     page.wait_for_timeout(1000)
 
-    log("[*] Resolviendo reCAPTCHA...")
+    progress("Resolviendo reCAPTCHA")
     with recaptchav2.SyncSolver(page) as solver:
         token = solver.solve_recaptcha(wait=True)
         log(f"[*] reCAPTCHA resuelto, token: {token[:40]}...")
+        progress("reCAPTCHA resuelto")
 
     page.wait_for_timeout(1000)
 
@@ -75,51 +132,52 @@ def login(page):
 
     # Wait for the dashboard to load — look for the account number on the page
     page.wait_for_selector("text=Panel de Control", timeout=30000)
-    log("[*] Dashboard cargado.")
+    progress("Sesión iniciada")
 
 
-def fetch():
+def fetch(browser):
     """Fetch unpaid bills from the Ecogas dashboard."""
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch()
-        page = browser.new_page(viewport={"width": 1280, "height": 720})
+    context = None
+    try:
+        context, restored = new_context(browser)
+        page = context.new_page()
+        login(page, restored)
 
-        try:
-            login(page)
+        # Check if there's no debt
+        no_debt = page.query_selector("text=Estas al dia")
+        if no_debt is None:
+            no_debt = page.query_selector("text=No tienes deuda")
 
-            # Check if there's no debt
-            no_debt = page.query_selector("text=Estas al dia")
-            if no_debt is None:
-                no_debt = page.query_selector("text=No tienes deuda")
+        if no_debt:
+            log("[*] No hay deuda pendiente.")
+            return {"errors": [], "bills": [], "session": context.storage_state()}
 
-            if no_debt:
-                log("[*] No hay deuda pendiente.")
-                return {"errors": [], "bills": []}
+        # Parse the "Comprobantes Adeudados" section (DataTables table)
+        bills = []
+        bill_rows = page.query_selector_all("table tbody tr")
 
-            # Parse the "Comprobantes Adeudados" section (DataTables table)
-            bills = []
-            bill_rows = page.query_selector_all("table tbody tr")
+        for row in bill_rows:
+            bill = parse_bill_row(row)
+            if bill:
+                bills.append(bill)
+        progress(f"{len(bills)} facturas leídas")
 
-            for row in bill_rows:
-                bill = parse_bill_row(row)
-                if bill:
-                    bills.append(bill)
+        if not bills:
+            debug_path = os.environ.get("DEBUG_HTML_PATH")
+            if debug_path:
+                with open(debug_path, "w") as f:
+                    f.write(page.content())
+                log(f"[DEBUG] HTML guardado en {debug_path}")
 
-            if not bills:
-                debug_path = os.environ.get("DEBUG_HTML_PATH")
-                if debug_path:
-                    with open(debug_path, "w") as f:
-                        f.write(page.content())
-                    log(f"[DEBUG] HTML guardado en {debug_path}")
+        return {"errors": [], "bills": bills, "session": context.storage_state()}
 
-            return {"errors": [], "bills": bills}
+    except Exception as e:
+        log(f"[ERROR] {e}")
+        return {"errors": [str(e)], "bills": []}
 
-        except Exception as e:
-            log(f"[ERROR] {e}")
-            return {"errors": [str(e)], "bills": []}
-
-        finally:
-            browser.close()
+    finally:
+        if context is not None:
+            context.close()
 
 
 def parse_date(dd_mm_yyyy):
@@ -130,12 +188,15 @@ def parse_date(dd_mm_yyyy):
     return f"{match.group(3)}-{match.group(2)}-{match.group(1)}"
 
 
-def parse_bill_row(row):
+def parse_bill_row(row, paid=False):
     """Extract bill data from a comprobante table row.
 
     The rows are tab-separated with columns:
       ID  Type  Amount  DueDate  PayDate(or IssueDate)
     Example: "0401B55066766A  FC  25.262,95  23/01/2026  13/01/2026"
+
+    With `paid`, the row comes from the paid comprobantes list and the last
+    date is the payment date.
     """
     text = row.inner_text().strip()
 
@@ -157,91 +218,171 @@ def parse_bill_row(row):
     # First date is the due date (vencimiento)
     due_date = parse_date(cols[3]) if len(cols) > 3 else ""
 
-    return {
+    bill = {
         "id": bill_id,
         "amountCents": amount_cents,
         "currency": "ARS",
         "dueDate": due_date,
-        "status": "UNPAID",
+        "status": "PAID" if paid else "UNPAID",
     }
+    if paid and len(cols) > 4 and parse_date(cols[4]):
+        bill["paidDate"] = parse_date(cols[4])
+    return bill
 
 
-def history():
+def history(browser):
     """Fetch payment history from Ecogas."""
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch()
-        page = browser.new_page(viewport={"width": 1280, "height": 720})
-
-        try:
-            login(page)
-
-            # Click on "Ver comprobantes pagados"
-            link = page.query_selector("text=Ver comprobantes pagados")
-            if not link:
-                link = page.query_selector("text=comprobantes pagados")
+    context = None
+    try:
+        context, restored = new_context(browser)
+        page = context.new_page()
+        login(page, restored)
+
+        # Click on "Ver comprobantes pagados"
+        link = page.query_selector("text=Ver comprobantes pagados")
+        if not link:
+            link = page.query_selector("text=comprobantes pagados")
+
+        if not link:
+            return {
+                "errors": ["No se encontró el enlace a comprobantes pagados"],
+                "bills": [],
+            }
+
+        link.click()
+        page.wait_for_timeout(3000)
+
+        bills = []
+        batch = []
+        found = 0
+        bill_rows = page.query_selector_all("table tbody tr")
+
+        for row in bill_rows:
+            bill = parse_bill_row(row, paid=True)
+            if bill:
+                found += 1
+                batch.append(bill)
+            if len(batch) >= STREAM_BATCH_SIZE:
+                progress(f"{found} comprobantes leídos")
+                if not emit({"type": "bills", "bills": batch}):
+                    bills.extend(batch)
+                batch = []
+
+        progress(f"{found} comprobantes leídos")
+        if batch and not emit({"type": "bills", "bills": batch}):
+            bills.extend(batch)
+
+        if not found:
+            debug_path = os.environ.get("DEBUG_HTML_PATH")
+            if debug_path:
+                with open(debug_path, "w") as f:
+                    f.write(page.content())
+                log(f"[DEBUG] HTML guardado en {debug_path}")
+
+        return {"errors": [], "bills": bills, "session": context.storage_state()}
+
+    except Exception as e:
+        log(f"[ERROR] {e}")
+        return {"errors": [str(e)], "bills": []}
+
+    finally:
+        if context is not None:
+            context.close()
 
-            if not link:
-                return {
-                    "errors": ["No se encontró el enlace a comprobantes pagados"],
-                    "bills": [],
-                }
 
-            link.click()
-            page.wait_for_timeout(3000)
+def pay(bill_id):
+    """Pay is not supported for Ecogas."""
+    return {
+        "errors": ["Comando 'pay' no soportado para Ecogas. Pagar manualmente en el sitio web."],
+        "bills": [],
+    }
 
-            bills = []
-            bill_rows = page.query_selector_all("table tbody tr")
 
-            for row in bill_rows:
-                bill = parse_bill_row(row)
-                if bill:
-                    bill["status"] = "PAID"
-                    bills.append(bill)
+def run_command(browser, command, args):
+    if command == "fetch":
+        return fetch(browser)
+    if command == "pay":
+        if not args:
+            return {"errors": ["Uso: ecogas.py pay <bill_id>"], "bills": []}
+        return pay(args[0])
+    if command == "history":
+        return history(browser)
+    return {"errors": [f"Comando desconocido: {command}"], "bills": []}
+
+
+@contextmanager
+def job_env(env):
+    """Apply the variables of one worker job, restoring the previous environment afterwards."""
+    previous = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
 
-            if not bills:
-                debug_path = os.environ.get("DEBUG_HTML_PATH")
-                if debug_path:
-                    with open(debug_path, "w") as f:
-                        f.write(page.content())
-                    log(f"[DEBUG] HTML guardado en {debug_path}")
 
-            return {"errors": [], "bills": bills}
+def serve():
+    """Worker mode: keep Chromium running and answer one JSON request per stdin line."""
+    global current_request_id
 
-        except Exception as e:
-            log(f"[ERROR] {e}")
-            return {"errors": [str(e)], "bills": []}
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        output({"ready": True, "protocol": PROTOCOL_VERSION})
 
+        try:
+            for line in sys.stdin:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                if request.get("command") == "shutdown":
+                    break
+
+                if not browser.is_connected():
+                    log("[*] Navegador desconectado, relanzando...")
+                    browser = pw.chromium.launch()
+
+                current_request_id = request.get("id")
+                with job_env(request.get("env", {})):
+                    result = missing_env("NUMERO_CUENTA") or run_command(
+                        browser, request.get("command"), request.get("args", [])
+                    )
+                output({"id": current_request_id, "result": result})
+                current_request_id = None
         finally:
             browser.close()
 
 
-def pay(bill_id):
-    """Pay is not supported for Ecogas."""
-    return {
-        "errors": ["Comando 'pay' no soportado para Ecogas. Pagar manualmente en el sitio web."],
-        "bills": [],
-    }
-
-
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        output({"errors": ["Uso: ecogas.py <fetch|pay|history> [bill_id]"], "bills": []})
+        output({"errors": ["Uso: ecogas.py <fetch|pay|history|serve> [bill_id]"], "bills": []})
         sys.exit(1)
 
+    command = sys.argv[1]
+
+    if command == "serve":
+        serve()
+        sys.exit(0)
+
     require_env("NUMERO_CUENTA")
 
-    command = sys.argv[1]
+    if command == "pay" and len(sys.argv) < 3:
+        output({"errors": ["Uso: ecogas.py pay <bill_id>"], "bills": []})
+        sys.exit(1)
 
-    if command == "fetch":
-        result = fetch()
-    elif command == "pay":
-        if len(sys.argv) < 3:
-            output({"errors": ["Uso: ecogas.py pay <bill_id>"], "bills": []})
-            sys.exit(1)
-        result = pay(sys.argv[2])
-    elif command == "history":
-        result = history()
+    if command in ("fetch", "history"):
+        with sync_playwright() as pw:
+            browser = pw.chromium.launch()
+            try:
+                result = run_command(browser, command, sys.argv[2:])
+            finally:
+                browser.close()
     else:
-        result = {"errors": [f"Comando desconocido: {command}"], "bills": []}
+        result = run_command(None, command, sys.argv[2:])
 
+    if os.environ.get("DRIVER_STREAM"):
+        result = {"type": "result", **result}
     output(result)
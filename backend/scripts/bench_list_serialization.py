@@ -0,0 +1,103 @@
+"""Compare the two ways list endpoints serialize bills (see app/utils/fast_json.py).
+
+- orm:  ORM entities validated through BillResponse, then jsonable_encoder and
+        json.dumps, as FastAPI does with response_model.
+- fast: plain columns selected with Core and encoded straight to JSON bytes
+        (FAST_LIST_RESPONSES, orjson when installed).
+
+Usage (from backend/):
+    uv run python scripts/bench_list_serialization.py [--sizes 1000 10000 100000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# A throwaway database, set before the app reads its settings
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}/bench.db"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import delete, insert  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.account import Account  # noqa: E402
+from app.models.bill import Bill  # noqa: E402
+from app.routers.bills import bills_query  # noqa: E402
+from app.schemas.bill import BillResponse  # noqa: E402
+from app.utils import fast_json  # noqa: E402
+
+BILLS = TypeAdapter(list[BillResponse])
+
+
+def seed(db, count: int):
+    db.execute(delete(Bill))
+    db.execute(insert(Bill), [
+        {
+            "account_id": 1,
+            "external_id": str(i),
+            "amount_cents": 1000 + i,
+            "currency": "ARS",
+            "due_date": date(2020, 1, 1) + timedelta(days=i % 3000),
+            "status": "PAID" if i % 3 else "UNPAID",
+        }
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def orm_path(db) -> bytes:
+    rows = db.scalars(bills_query()).all()
+    content = jsonable_encoder(BILLS.validate_python(rows, from_attributes=True))
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+    db.expunge_all()
+    return body
+
+
+def fast_path(db) -> bytes:
+    rows = db.execute(fast_json.schema_columns(bills_query(), BillResponse)).all()
+    return fast_json.dumps([row._asdict() for row in rows])
+
+
+def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            fn(db)
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add(Account(id=1, name="Bench", identifiers={}))
+        db.commit()
+
+    encoder = "orjson" if fast_json.orjson is not None else "json"
+    print(f"{'rows':>8} {'orm (ms)':>10} {'fast (ms)':>10} {'speedup':>8}   encoder: {encoder}")
+    for size in args.sizes:
+        with SessionLocal() as db:
+            seed(db, size)
+            if json.loads(orm_path(db)) != json.loads(fast_path(db)):
+                sys.exit(f"Outputs differ at {size} rows")
+        orm = measure(orm_path, args.repeat)
+        fast = measure(fast_path, args.repeat)
+        print(f"{size:>8} {orm * 1000:>10.1f} {fast * 1000:>10.1f} {orm / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Point the app at a throwaway database before any test imports it."""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
@@ -0,0 +1,13 @@
+"""Driver stdout is read one bounded line at a time."""
+import io
+
+from app.services.driver_pool import bounded_lines
+
+
+def test_long_line_is_discarded():
+    stream = io.StringIO('{"type": "progress"}\n' + "x" * 100 + '\n{"bills": []}\nlast')
+    assert list(bounded_lines(stream, 30)) == ['{"type": "progress"}\n', None, '{"bills": []}\n', "last"]
+
+
+def test_line_of_exactly_the_limit_is_kept():
+    assert list(bounded_lines(io.StringIO("x" * 10 + "\n" + "y" * 10), 10)) == ["x" * 10 + "\n", "y" * 10]
@@ -0,0 +1,39 @@
+"""Lookup cache entries follow the resource_versions counters."""
+import pytest
+
+from app.database import Base, SessionLocal, engine
+from app.models import Account
+from app.services import lookup_cache
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    lookup_cache.invalidate_accounts()
+    with SessionLocal() as db:
+        db.add(Account(id=1, name="Ecogas"))
+        db.commit()
+        yield db
+    Base.metadata.drop_all(engine)
+
+
+def test_hit_while_unchanged(db):
+    lookup_cache.account(db, 1)
+    hits = lookup_cache.account_cache.hits
+    assert lookup_cache.account(db, 1).name == "Ecogas"
+    assert lookup_cache.account_cache.hits == hits + 1
+
+
+def test_write_from_another_process_is_seen(db):
+    assert [a.name for a in lookup_cache.accounts(db)] == ["Ecogas"]
+    assert lookup_cache.account(db, 1).name == "Ecogas"
+
+    # Another process: commits without invalidating this process' cache
+    with SessionLocal() as other:
+        other.get(Account, 1).name = "Ecogas Centro"
+        other.add(Account(id=2, name="Aysa"))
+        other.commit()
+
+    db.rollback()  # end the read transaction, as each request does
+    assert lookup_cache.account(db, 1).name == "Ecogas Centro"
+    assert [a.name for a in lookup_cache.accounts(db)] == ["Ecogas Centro", "Aysa"]
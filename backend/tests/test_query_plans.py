@@ -0,0 +1,143 @@
+"""EXPLAIN QUERY PLAN of the list endpoints and hot lookups on a seeded
+100k-row database.
+
+Every list path must read through an index in the order of its keyset: no full
+table scan and no temporary B-tree to sort. An unfiltered first page walks an
+index (`SCAN ... USING INDEX`), which is the best an ordered full read can do;
+accounts are listed by id, the table's own (rowid) order. Lookups must SEARCH
+an index instead of scanning their table.
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+
+from app.database import Base
+from app.models import Account, Bill, Payment, Task
+from app.routers.accounts import ACCOUNTS_KEYSET, accounts_query
+from app.routers.bills import BILLS_KEYSET, bills_query
+from app.routers.payments import PAYMENTS_KEYSET, payments_query
+from app.routers.tasks import TASKS_KEYSET, tasks_query
+from app.schemas.account import AccountResponse
+from app.schemas.bill import BillResponse
+from app.schemas.payment import PaymentResponse
+from app.schemas.task import TaskSummary
+from app.utils.pagination import encode_cursor, page_statement
+
+ROWS = 100_000
+ACCOUNTS = 50
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    Base.metadata.create_all(engine)
+    start = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Account), [{"id": i, "name": f"Cuenta {i}"} for i in range(1, ACCOUNTS + 1)])
+        conn.execute(insert(Bill), [
+            {
+                "account_id": i % ACCOUNTS + 1,
+                "external_id": str(i),
+                "amount_cents": 1000 + i,
+                "currency": "ARS",
+                "due_date": date(2020, 1, 1) + timedelta(days=i % 2000),
+                "status": "PAID" if i % 3 else "UNPAID",
+                "fetched_at": start,
+            }
+            for i in range(ROWS)
+        ])
+        conn.execute(insert(Payment), [
+            {
+                "account_id": i % ACCOUNTS + 1,
+                "bill_id": i + 1 if i % 2 else None,
+                "amount": 10 + i % 500,
+                "paid_at": start + timedelta(minutes=i),
+                "status": "completed",
+            }
+            for i in range(ROWS)
+        ])
+        conn.execute(insert(Task), [
+            {
+                "id": f"task-{i:06d}",
+                "type": "sync" if i % 4 else "pay",
+                "status": "completed" if i % 5 else "failed",
+                "account_id": i % ACCOUNTS + 1,
+                "driver_name": f"driver{i % 5}",
+                "created_at": start + timedelta(minutes=i),
+                "finished_at": start + timedelta(minutes=i + 1),
+            }
+            for i in range(ROWS)
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, statement) -> list[str]:
+    compiled = statement.compile(engine, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return [row[-1] for row in rows]
+
+
+def list_statements(query, keyset, schema, cursor_values):
+    """First and following page, with the fast (plain columns) and ORM selects."""
+    cursor = encode_cursor(cursor_values)
+    for fast in (schema, None):
+        for page_cursor in (None, cursor):
+            yield page_statement(query, keyset, 100, page_cursor, schema=fast)[0]
+
+
+CASES = {
+    "accounts": (accounts_query(), ACCOUNTS_KEYSET, AccountResponse, [25]),
+    "bills": (bills_query(), BILLS_KEYSET, BillResponse, [date(2021, 1, 1), 500]),
+    "bills by account": (bills_query(account_id=7), BILLS_KEYSET, BillResponse, [date(2021, 1, 1), 500]),
+    "bills by status": (bills_query(status="UNPAID"), BILLS_KEYSET, BillResponse, [date(2021, 1, 1), 500]),
+    "bills by account and status": (
+        bills_query(account_id=7, status="UNPAID"), BILLS_KEYSET, BillResponse, [date(2021, 1, 1), 500]
+    ),
+    "payments": (payments_query(), PAYMENTS_KEYSET, PaymentResponse, [datetime(2020, 3, 1), 500]),
+    "payments by account": (payments_query(account_id=7), PAYMENTS_KEYSET, PaymentResponse, [datetime(2020, 3, 1), 500]),
+    "tasks": (tasks_query([]), TASKS_KEYSET, TaskSummary, [datetime(2020, 3, 1), "task-000500"]),
+    "tasks by type and status": (
+        tasks_query([Task.type == "pay", Task.status == "failed"]), TASKS_KEYSET, TaskSummary,
+        [datetime(2020, 3, 1), "task-000500"],
+    ),
+    "tasks by driver": (
+        tasks_query([Task.driver_name == "driver1"]), TASKS_KEYSET, TaskSummary, [datetime(2020, 3, 1), "task-000500"]
+    ),
+}
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_list_uses_index_order(engine, case):
+    query, keyset, schema, cursor_values = CASES[case]
+    for statement in list_statements(query, keyset, schema, cursor_values):
+        plan = query_plan(engine, statement)
+        assert not any("TEMP B-TREE" in step for step in plan), plan
+        if keyset != ACCOUNTS_KEYSET:
+            assert all("USING" in step for step in plan if step.startswith("SCAN")), plan
+
+
+LOOKUPS = {
+    # record_paid_bills: bills of a sync without a payment yet
+    "unpaid bills without payment": select(Bill).where(
+        Bill.account_id == 7, Bill.external_id.in_(["1", "2"]), ~Bill.payments.any()
+    ),
+    # POST /accounts/{id}/sync: in-flight and recent syncs of the account
+    "in-flight sync": select(Task).where(
+        Task.account_id == 7, Task.type == "sync", Task.status.in_(("pending", "running"))
+    ).order_by(Task.created_at.desc()).limit(1),
+    "recent sync": select(Task).where(
+        Task.account_id == 7, Task.type == "sync", Task.status == "completed",
+        Task.finished_at >= datetime(2020, 3, 1),
+    ).order_by(Task.finished_at.desc()).limit(1),
+}
+
+
+@pytest.mark.parametrize("case", list(LOOKUPS))
+def test_lookup_uses_index(engine, case):
+    plan = query_plan(engine, LOOKUPS[case])
+    assert not any(step.startswith("SCAN") for step in plan), plan
@@ -0,0 +1,59 @@
+"""One queued or running sync per account, even for concurrent requests."""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.database import Base, SessionLocal, engine
+from app.models import Account, Task
+from app.routers import accounts
+from app.schemas.account import AccountResponse
+from app.services.task_executor import new_task
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add(Account(id=1, name="A", driver_name="a"))
+        db.commit()
+        yield db
+    Base.metadata.drop_all(engine)
+
+
+def in_flight(db) -> list[str]:
+    return list(db.scalars(
+        select(Task.id).where(Task.account_id == 1, Task.type == "sync", Task.status.in_(("pending", "running")))
+    ))
+
+
+def test_concurrent_request_is_coalesced(db, monkeypatch):
+    account = AccountResponse.model_validate(db.get(Account, 1))
+    check = accounts.existing_sync
+    concurrent = []
+
+    def racing_check(db, account, force):
+        found = check(db, account, force)
+        if not concurrent:  # another request queues its sync right after our check
+            with SessionLocal() as other:
+                task = new_task("sync", 1, "a")
+                other.add(task)
+                other.commit()
+                concurrent.append(task.id)
+        return found
+
+    monkeypatch.setattr(accounts, "existing_sync", racing_check)
+    reason, task = accounts.start_sync(db, account, force=False)
+    db.commit()
+    assert (reason, task.id) == ("coalesced", concurrent[0])
+    assert in_flight(db) == concurrent
+
+
+def test_index_rejects_a_second_in_flight_sync(db):
+    db.add(new_task("sync", 1, "a"))
+    db.commit()
+    db.add(new_task("sync", 1, "a"))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+    db.add(new_task("backfill", 1, "a"))  # other task types are not limited
+    db.commit()
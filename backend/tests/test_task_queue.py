@@ -0,0 +1,80 @@
+"""Claim order of the task queue with per-driver caps."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.database import Base, SessionLocal, engine
+from app.models import Account, Task
+from app.services.task_executor import TaskExecutor, new_task, queue_position
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add_all([Account(id=1, name="A", driver_name="a"), Account(id=2, name="B", driver_name="b")])
+        db.commit()
+        yield db
+    Base.metadata.drop_all(engine)
+
+
+def executor(concurrency=2, max_per_driver=1) -> TaskExecutor:
+    return TaskExecutor("test", concurrency, max_per_driver, lease_seconds=60, poll_interval=1, max_attempts=3)
+
+
+def queue(db, drivers: str) -> list[str]:
+    """One pending backfill per letter of `drivers`, in that order (backfills,
+    unlike syncs, can queue up for the same account)."""
+    start = datetime.now(timezone.utc)
+    ids = []
+    for i, driver in enumerate(drivers):
+        task = new_task("backfill", 1 if driver == "a" else 2, driver)
+        task.created_at = start + timedelta(seconds=i)
+        db.add(task)
+        ids.append(task.id)
+    db.commit()
+    return ids
+
+
+def claimed_drivers(executor: TaskExecutor, times: int) -> list[str | None]:
+    return [task.driver_name if task else None for task in (executor.claim() for _ in range(times))]
+
+
+def test_backlog_of_one_driver_does_not_starve_the_others(db):
+    queue(db, "a" * 10 + "b")
+    assert claimed_drivers(executor(), 3) == ["a", "b", None]
+
+
+def test_per_driver_cap(db):
+    queue(db, "aaab")
+    assert claimed_drivers(executor(max_per_driver=2), 4) == ["a", "a", "b", None]
+
+
+def test_expired_lease_frees_the_driver(db):
+    first, *_ = queue(db, "aa")
+    queue_executor = executor()
+    assert claimed_drivers(queue_executor, 2) == ["a", None]
+    db.get(Task, first).lease_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+    task = queue_executor.claim()
+    assert task is not None and task.driver_name == "a"
+
+
+@pytest.mark.parametrize("max_per_driver", [1, 2])
+def test_queue_position_matches_claim_order(db, max_per_driver):
+    queue(db, "a")
+    claimer = executor(max_per_driver=max_per_driver)
+    claimer.claim()  # an "a" task is already running
+    pending = queue(db, "aababbb")
+    pay = new_task("pay", 2, "b")  # payments jump the queue
+    db.add(pay)
+    db.commit()
+    pending.append(pay.id)
+    positions = {task_id: queue_position(db, db.get(Task, task_id), max_per_driver) for task_id in pending}
+
+    claimed = []
+    while (task := claimer.claim()) is not None:
+        claimed.append(task.id)
+    assert [positions[task_id] for task_id in claimed] == list(range(1, len(claimed) + 1))
+    waiting = [positions[task_id] for task_id in pending if task_id not in claimed]
+    assert waiting and min(waiting) > len(claimed)
@@ -0,0 +1,37 @@
+"""GET /tasks/{id} body of bulk (parent) tasks."""
+import pytest
+
+from app.database import Base, SessionLocal, engine
+from app.models import Account, Task
+from app.routers.tasks import task_response
+from app.services.task_executor import finish_parent, new_task
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add_all([Account(id=1, name="A", driver_name="a"), Account(id=2, name="B", driver_name="a")])
+        db.commit()
+        yield db
+    Base.metadata.drop_all(engine)
+
+
+def test_parent_keeps_child_counts_after_finishing(db):
+    parent = new_task("sync_all", None, None)
+    parent.status = "running"
+    db.add(parent)
+    db.flush()
+    children = [new_task("sync", account_id, "a", parent_id=parent.id) for account_id in (1, 2)]
+    db.add_all(children)
+    db.commit()
+    assert task_response(db, parent).result == {"total": 2, "done": 0, "failed": 0}
+
+    children[0].status = "completed"
+    children[1].status = "failed"
+    db.commit()
+    finish_parent(db, parent.id)
+    db.expire_all()  # a fresh read: `result` is deferred
+    response = task_response(db, db.get(Task, parent.id))
+    assert response.status == "completed"
+    assert response.result == {"total": 2, "done": 1, "failed": 1}
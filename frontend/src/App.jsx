@@ -1,10 +1,12 @@
 import { useState } from 'react';
 import AccountsPage from './pages/AccountsPage';
 import BillsPage from './pages/BillsPage';
+import DashboardPage from './pages/DashboardPage';
 import PaymentMethodsPage from './pages/PaymentMethodsPage';
 import PaymentsPage from './pages/PaymentsPage';
 
 const TABS = [
+  { id: 'dashboard', label: 'Resumen' },
   { id: 'accounts', label: 'Cuentas' },
   { id: 'cards', label: 'Tarjetas' },
   { id: 'bills', label: 'Facturas' },
@@ -12,7 +14,7 @@ const TABS = [
 ];
 
 function App() {
-  const [activeTab, setActiveTab] = useState('accounts');
+  const [activeTab, setActiveTab] = useState('dashboard');
 
   return (
     <div>
@@ -41,6 +43,7 @@ function App() {
         ))}
       </nav>
 
+      {activeTab === 'dashboard' && <DashboardPage />}
       {activeTab === 'accounts' && <AccountsPage />}
       {activeTab === 'cards' && <PaymentMethodsPage />}
       {activeTab === 'bills' && <BillsPage />}
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import AccountList from '../components/AccountList';
 import AccountForm from '../components/AccountForm';
-import { getAccounts, createAccount, updateAccount, deleteAccount, syncAccount, pollTask } from '../services/api';
+import { getAccounts, createAccount, updateAccount, deleteAccount, syncAccount, syncAccounts, pollTask } from '../services/api';
 
 export default function AccountsPage() {
   const [accounts, setAccounts] = useState([]);
@@ -10,6 +10,7 @@ export default function AccountsPage() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [syncingAccounts, setSyncingAccounts] = useState({});
+  const [syncingAll, setSyncingAll] = useState(false);
 
   useEffect(() => {
     loadAccounts();
@@ -81,6 +82,22 @@ export default function AccountsPage() {
     }
   };
 
+  const handleSyncAll = async () => {
+    try {
+      setSyncingAll(true);
+      setError(null);
+      const { task_id } = await syncAccounts();
+      const task = await pollTask(task_id);
+      if (task.error) {
+        setError(task.error);
+      }
+    } catch (err) {
+      setError('Error al sincronizar cuentas');
+    } finally {
+      setSyncingAll(false);
+    }
+  };
+
   const handleCancel = () => {
     setShowForm(false);
     setEditingAccount(null);
@@ -95,9 +112,16 @@ export default function AccountsPage() {
       <div className="header">
         <h1>Mis Cuentas</h1>
         {!showForm && (
-          <button className="btn btn-primary" onClick={() => setShowForm(true)}>
-            + Nueva Cuenta
-          </button>
+          <div className="actions" style={{ marginTop: 0 }}>
+            {accounts.some((a) => a.driver_name) && (
+              <button className="btn btn-secondary" disabled={syncingAll} onClick={handleSyncAll}>
+                {syncingAll ? 'Sincronizando...' : 'Sincronizar todas'}
+              </button>
+            )}
+            <button className="btn btn-primary" onClick={() => setShowForm(true)}>
+              + Nueva Cuenta
+            </button>
+          </div>
         )}
       </div>
 
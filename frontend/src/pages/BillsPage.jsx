@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { getBills, getAccounts, getPaymentMethods, syncAccount, payBill, pollTask } from '../services/api';
+import { getBills, getAccounts, getPaymentMethods, syncAccount, payBill, payBills, pollTask } from '../services/api';
 
 export default function BillsPage() {
   const [bills, setBills] = useState([]);
@@ -9,6 +9,7 @@ export default function BillsPage() {
   const [error, setError] = useState(null);
   const [syncingAccounts, setSyncingAccounts] = useState({});
   const [payingBills, setPayingBills] = useState({});
+  const [payingAll, setPayingAll] = useState(false);
 
   useEffect(() => {
     loadData();
@@ -50,19 +51,21 @@ export default function BillsPage() {
     }
   };
 
+  // undefined when the user cancels, null to pay without a payment method
+  const choosePaymentMethod = () => {
+    if (paymentMethods.length === 0) return null;
+    const options = paymentMethods.map((m) => `${m.name} (•••• ${m.last_four_digits})`);
+    const choice = window.prompt(
+      `Seleccioná medio de pago:\n${options.map((o, i) => `${i + 1}. ${o}`).join('\n')}\n\nIngresá el número (o dejá vacío para continuar sin medio de pago):`
+    );
+    if (choice === null) return undefined;
+    const idx = parseInt(choice, 10) - 1;
+    return idx >= 0 && idx < paymentMethods.length ? paymentMethods[idx].id : null;
+  };
+
   const handlePay = async (bill) => {
-    let paymentMethodId = null;
-    if (paymentMethods.length > 0) {
-      const options = paymentMethods.map((m) => `${m.name} (•••• ${m.last_four_digits})`);
-      const choice = window.prompt(
-        `Seleccioná medio de pago:\n${options.map((o, i) => `${i + 1}. ${o}`).join('\n')}\n\nIngresá el número (o dejá vacío para continuar sin medio de pago):`
-      );
-      if (choice === null) return;
-      const idx = parseInt(choice, 10) - 1;
-      if (idx >= 0 && idx < paymentMethods.length) {
-        paymentMethodId = paymentMethods[idx].id;
-      }
-    }
+    const paymentMethodId = choosePaymentMethod();
+    if (paymentMethodId === undefined) return;
 
     try {
       setPayingBills((prev) => ({ ...prev, [bill.id]: true }));
@@ -80,6 +83,26 @@ export default function BillsPage() {
     }
   };
 
+  const handlePayAll = async (payable) => {
+    const paymentMethodId = choosePaymentMethod();
+    if (paymentMethodId === undefined) return;
+
+    try {
+      setPayingAll(true);
+      setError(null);
+      const { task_id } = await payBills(payable.map((b) => b.id), paymentMethodId);
+      const task = await pollTask(task_id);
+      if (task.error) {
+        setError(task.error);
+      }
+      await loadData();
+    } catch (err) {
+      setError('Error al pagar facturas');
+    } finally {
+      setPayingAll(false);
+    }
+  };
+
   const accountsWithDrivers = accounts.filter((a) => a.driver_name);
 
   const getAccountName = (accountId) => {
@@ -105,6 +128,7 @@ export default function BillsPage() {
 
   const unpaidBills = bills.filter((b) => b.status === 'UNPAID');
   const paidBills = bills.filter((b) => b.status === 'PAID');
+  const payableBills = unpaidBills.filter((b) => accountsWithDrivers.some((a) => a.id === b.account_id));
 
   return (
     <div className="container">
@@ -138,7 +162,19 @@ export default function BillsPage() {
 
       {unpaidBills.length > 0 && (
         <>
-          <h2 style={{ marginBottom: '10px' }}>Pendientes</h2>
+          <div className="header">
+            <h2>Pendientes</h2>
+            {payableBills.length > 1 && (
+              <button
+                className="btn"
+                style={{ background: '#27ae60', color: 'white' }}
+                disabled={payingAll}
+                onClick={() => handlePayAll(payableBills)}
+              >
+                {payingAll ? 'Pagando...' : `Pagar todas (${payableBills.length})`}
+              </button>
+            )}
+          </div>
           <div className="account-list">
             {unpaidBills.map((bill) => (
               <div key={bill.id} className="card account-item">
@@ -160,7 +196,7 @@ export default function BillsPage() {
                   <button
                     className="btn"
                     style={{ background: '#27ae60', color: 'white' }}
-                    disabled={payingBills[bill.id]}
+                    disabled={payingAll || payingBills[bill.id]}
                     onClick={() => handlePay(bill)}
                   >
                     {payingBills[bill.id] ? 'Pagando...' : 'Pagar'}
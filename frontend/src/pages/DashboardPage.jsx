@@ -0,0 +1,162 @@
+import { useState, useEffect } from 'react';
+import { getDashboard } from '../services/api';
+
+const SYNC_STATUS = {
+  pending: { label: 'EN COLA', color: '#7f8c8d' },
+  running: { label: 'SINCRONIZANDO', color: '#3498db' },
+  completed: { label: 'SINCRONIZADA', color: '#27ae60' },
+  failed: { label: 'FALLÓ', color: '#c0392b' },
+};
+
+export default function DashboardPage() {
+  const [dashboard, setDashboard] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    loadDashboard();
+  }, []);
+
+  const loadDashboard = async () => {
+    try {
+      setLoading(true);
+      setDashboard(await getDashboard(5));
+      setError(null);
+    } catch (err) {
+      setError('Error al cargar el resumen. Asegurate de que el servidor esté corriendo.');
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const formatAmount = (amount, currency = 'ARS') => {
+    return new Intl.NumberFormat('es-AR', {
+      style: 'currency',
+      currency,
+    }).format(Number(amount));
+  };
+
+  const formatDate = (dateStr) => {
+    const [year, month, day] = dateStr.slice(0, 10).split('-');
+    return `${day}/${month}/${year}`;
+  };
+
+  if (loading) {
+    return <div className="container"><p>Cargando...</p></div>;
+  }
+
+  return (
+    <div className="container">
+      <div className="header">
+        <h1>Resumen</h1>
+        <button className="btn btn-secondary" onClick={loadDashboard}>
+          Actualizar
+        </button>
+      </div>
+
+      {error && (
+        <div className="card" style={{ background: '#fdeaea', color: '#c0392b', marginBottom: '15px' }}>
+          {error}
+        </div>
+      )}
+
+      {dashboard && (
+        <>
+          <div className="card" style={{ marginBottom: '20px' }}>
+            <h3>
+              {dashboard.unpaid_bills.length === 0
+                ? 'No hay facturas pendientes'
+                : `${dashboard.unpaid_bills.length} facturas pendientes, la próxima vence el ${formatDate(dashboard.next_due_date)}`}
+            </h3>
+          </div>
+
+          {dashboard.unpaid_bills.length > 0 && (
+            <>
+              <h2 style={{ marginBottom: '10px' }}>Pendientes</h2>
+              <div className="account-list">
+                {dashboard.unpaid_bills.map((bill) => (
+                  <div key={bill.id} className="card account-item">
+                    <div className="account-info">
+                      <h3>{bill.account_name}</h3>
+                      <p>
+                        <span style={{ fontWeight: 'bold', color: '#e67e22' }}>
+                          {formatAmount(bill.amount_cents / 100, bill.currency)}
+                        </span>
+                        <span style={{ marginLeft: '15px', color: '#666' }}>
+                          Vence: {formatDate(bill.due_date)}
+                        </span>
+                      </p>
+                    </div>
+                  </div>
+                ))}
+              </div>
+            </>
+          )}
+
+          {dashboard.accounts.length > 0 && (
+            <>
+              <h2 style={{ margin: '20px 0 10px' }}>Cuentas</h2>
+              <div className="account-list">
+                {dashboard.accounts.map((account) => {
+                  const sync = account.last_sync && SYNC_STATUS[account.last_sync.status];
+                  return (
+                    <div key={account.id} className="card account-item">
+                      <div className="account-info">
+                        <h3>{account.name}</h3>
+                        <p>
+                          {account.unpaid_count === 0
+                            ? 'Sin facturas pendientes'
+                            : `${account.unpaid_count} pendientes, próximo vencimiento ${formatDate(account.next_due_date)}`}
+                        </p>
+                        {account.last_sync?.error && (
+                          <p style={{ fontSize: '13px', color: '#c0392b' }}>{account.last_sync.error}</p>
+                        )}
+                      </div>
+                      <div className="actions">
+                        {sync && (
+                          <span className="badge" style={{ background: sync.color, color: 'white' }}>
+                            {sync.label}
+                          </span>
+                        )}
+                      </div>
+                    </div>
+                  );
+                })}
+              </div>
+            </>
+          )}
+
+          {dashboard.recent_payments.length > 0 && (
+            <>
+              <h2 style={{ margin: '20px 0 10px' }}>Últimos pagos</h2>
+              <div className="account-list">
+                {dashboard.recent_payments.map((payment) => (
+                  <div key={payment.id} className="card account-item" style={{ opacity: 0.7 }}>
+                    <div className="account-info">
+                      <h3>{payment.account_name}</h3>
+                      <p>
+                        <span style={{ fontWeight: 'bold', color: '#27ae60' }}>
+                          {formatAmount(payment.amount)}
+                        </span>
+                        <span style={{ marginLeft: '15px', color: '#666' }}>
+                          {formatDate(payment.paid_at)}
+                        </span>
+                      </p>
+                    </div>
+                  </div>
+                ))}
+              </div>
+            </>
+          )}
+
+          {dashboard.accounts.length === 0 && (
+            <div className="card empty-state">
+              <p>No hay cuentas.</p>
+              <p>Agregá una en la pestaña Cuentas.</p>
+            </div>
+          )}
+        </>
+      )}
+    </div>
+  );
+}
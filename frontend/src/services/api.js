@@ -93,6 +93,14 @@ export async function deletePayment(id) {
   return response.json();
 }
 
+// Dashboard
+export async function getDashboard(paymentsLimit = null) {
+  const qs = paymentsLimit ? `?payments_limit=${paymentsLimit}` : '';
+  const response = await fetch(`${API_BASE}/dashboard/${qs}`);
+  if (!response.ok) throw new Error('Error al obtener el resumen');
+  return response.json();
+}
+
 // Bills
 export async function getBills(accountId = null, status = null) {
   const params = new URLSearchParams();
@@ -113,6 +121,16 @@ export async function syncAccount(id) {
   return response.json();
 }
 
+export async function syncAccounts(filters = {}) {
+  const response = await fetch(`${API_BASE}/accounts/sync`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(filters),
+  });
+  if (!response.ok) throw new Error('Error al sincronizar cuentas');
+  return response.json();
+}
+
 export async function payBill(id, paymentMethodId = null) {
   const params = paymentMethodId ? `?payment_method_id=${paymentMethodId}` : '';
   const response = await fetch(`${API_BASE}/bills/${id}/pay${params}`, {
@@ -122,13 +140,47 @@ export async function payBill(id, paymentMethodId = null) {
   return response.json();
 }
 
+export async function payBills(billIds, paymentMethodId = null) {
+  const response = await fetch(`${API_BASE}/bills/pay`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ bill_ids: billIds, payment_method_id: paymentMethodId }),
+  });
+  if (!response.ok) throw new Error('Error al pagar facturas');
+  return response.json();
+}
+
 export async function getTask(id) {
   const response = await fetch(`${API_BASE}/tasks/${id}`);
   if (!response.ok) throw new Error('Error al obtener tarea');
   return response.json();
 }
 
+function watchTask(taskId) {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE}/tasks/${taskId}/events`);
+    source.onmessage = (event) => {
+      const task = JSON.parse(event.data);
+      if (task.status === 'completed' || task.status === 'failed') {
+        source.close();
+        resolve(task);
+      }
+    };
+    source.onerror = () => {
+      source.close();
+      reject(new Error('Se perdió la conexión con la tarea'));
+    };
+  });
+}
+
 export async function pollTask(taskId, intervalMs = 2000) {
+  if (typeof EventSource !== 'undefined') {
+    try {
+      return await watchTask(taskId);
+    } catch {
+      // Fall back to polling
+    }
+  }
   while (true) {
     const task = await getTask(taskId);
     if (task.status === 'completed' || task.status === 'failed') {